@@ -33,6 +33,9 @@ DB_PASSWORD = env("DB_PASSWORD", "password")
 # Construct database URL
 DB_URL = env("DB_URL", f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
 
+# Logging
+DEBUG = env("DEBUG", "false").lower() in ("1", "true")  # Verbose (pretty-printed) strategy logs
+
 # Add validation to warn about potential misconfigurations
 def validate_ib_config():
     """Validate IBKR configuration and warn about potential issues."""
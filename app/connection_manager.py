@@ -6,14 +6,75 @@ Manages connections to Interactive Brokers with health monitoring and reconnecti
 from .ib_adapter import IBManager
 import asyncio
 import logging
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from enum import Enum
 import os
 
+logger = logging.getLogger(__name__)
+
+class ConnectionStatus(Enum):
+    CONNECTED = "connected"
+    DISCONNECTED = "disconnected"
+
+@dataclass
+class ConnectionInfo:
+    status: ConnectionStatus
+    changed_at: datetime
+
 class ConnectionManager:
     def __init__(self):
         self._started = False
         self._mode = None  # "paper" | "real"
+        self._connected = False
+        self.version = 0  # bumped on every connection state change, lets callers cache summaries
+        self._callbacks: List[Callable[[str, ConnectionInfo], None]] = []
+        self._changed_at: Optional[datetime] = None
+
+    def _set_state(self, mode, connected: bool):
+        if (mode, connected) != (self._mode, self._connected):
+            prev_mode, prev_connected = self._mode, self._connected
+            self._mode = mode
+            self._connected = connected
+            self._changed_at = datetime.now()
+            self.version += 1
+            # Switching modes drops the previous one; tell its listeners too
+            if prev_connected and prev_mode is not None and prev_mode != mode:
+                self._notify(prev_mode, False)
+            if mode is not None:
+                self._notify(mode, connected)
+
+    def get_connection_summary(self) -> Dict[str, object]:
+        """Snapshot of the connection state; unchanged until version is bumped."""
+        return {
+            "started": self._started,
+            "active_mode": self._mode,
+            "connected": self._connected,
+            "last_change": self._changed_at.isoformat() if self._changed_at else None,
+            "connections": {
+                mode: "connected" if self.is_connected(mode) else "disconnected"
+                for mode in ("paper", "real")
+            },
+        }
+
+    def _notify(self, mode: str, connected: bool):
+        status = ConnectionStatus.CONNECTED if connected else ConnectionStatus.DISCONNECTED
+        info = ConnectionInfo(status=status, changed_at=datetime.now())
+        for cb in list(self._callbacks):
+            try:
+                cb(mode, info)
+            except Exception as e:
+                logger.error(f"Connection callback failed: {e}")
+
+    def is_connected(self, mode: str) -> bool:
+        """True if the shared IB connection is up in the given mode."""
+        return self._connected and self._mode == mode
+
+    def register_connection_callback(self, callback: Callable[[str, ConnectionInfo], None]):
+        """Call callback(mode, info) whenever a mode connects or disconnects."""
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
 
     async def start(self):
         # Marker; never create/set a new loop here.
@@ -24,14 +85,15 @@ class ConnectionManager:
         mode: "paper" or "real"
         """
         paper = (mode == "paper")
-        self._mode = mode
 
         ib = await IBManager.instance().connect(paper=paper, client_id=19)
         # Smoke test to guarantee we’re on THIS loop:
         try:
             _ = await ib.reqCurrentTimeAsync()
+            self._set_state(mode, True)
             return True
         except Exception:
+            self._set_state(mode, False)
             return False
 
     async def stop(self):
@@ -42,5 +104,6 @@ class ConnectionManager:
             await IBManager.instance().disconnect()
         finally:
             self._started = False
+            self._set_state(self._mode, False)
 
 connection_manager = ConnectionManager()
@@ -18,6 +18,7 @@ class FileStrategyLoader:
     
     def __init__(self, strategies_dir: str = "cursorstrategies"):
         self.strategies_dir = strategies_dir
+        # filepath -> ((mtime_ns, size), strategy class); reused while the file is unchanged
         self.strategies_cache = {}
         self._ensure_strategies_dir()
     
@@ -34,7 +35,8 @@ class FileStrategyLoader:
         
         strategy_files = []
         for file in os.listdir(self.strategies_dir):
-            if file.endswith('.py') and not file.startswith('__'):
+            # Underscore modules (__init__, shared helpers like _indicators) aren't strategies
+            if file.endswith('.py') and not file.startswith('_'):
                 strategy_files.append(file)
         
         return sorted(strategy_files)
@@ -43,12 +45,19 @@ class FileStrategyLoader:
         """Load a strategy class from a Python file."""
         filepath = os.path.join(self.strategies_dir, filename)
         
-        if not os.path.exists(filepath):
+        try:
+            st = os.stat(filepath)
+        except OSError:
             print(f"Strategy file not found: {filepath}")
             return None
         
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self.strategies_cache.get(filepath)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
         try:
-            # Load the module
+            # Load the module (SourceFileLoader reuses __pycache__ bytecode when it is current)
             spec = importlib.util.spec_from_file_location(filename[:-3], filepath)
             if spec is None or spec.loader is None:
                 print(f"Failed to create spec for {filename}")
@@ -71,6 +80,7 @@ class FileStrategyLoader:
                 print(f"No Strategy subclass found in {filename}")
                 return None
             
+            self.strategies_cache[filepath] = (stamp, strategy_class)
             return strategy_class
             
         except Exception as e:
@@ -2,6 +2,7 @@
 Strategies router for managing and running strategies.
 """
 import json
+import traceback
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Request, Form, Query
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
@@ -798,7 +799,6 @@ async def stop_deployment_api(deployment_id: int, session: AsyncSession = Depend
             
     except Exception as e:
         print(f"Error stopping deployment {deployment_id}: {e}")
-        import traceback
         traceback.print_exc()
         return {"success": False, "error": str(e)}
 
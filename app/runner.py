@@ -7,8 +7,11 @@ import time
 import os
 import sys
 import platform
-from typing import Dict, List, Optional
+from typing import Callable, Deque, Dict, List, Optional
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
+from . import config
 from .ib_adapter import IBManager
 from .strategy_loader import load_strategy_from_code
 from .connection_manager import connection_manager
@@ -28,52 +31,106 @@ if platform.system() == "Windows":
 else:
     WINDOWS_AVAILABLE = False
 
+# Upper bound on log lines kept in memory per strategy
+MAX_LOG_LINES = 10000
+
+class _Slot:
+    """Per-strategy storage: running task, its metadata and its log lines."""
+    __slots__ = ("task", "info", "logs")
+
+    def __init__(self, task: Optional[asyncio.Task] = None, info: Optional[dict] = None):
+        self.task = task
+        self.info = info
+        self.logs: Deque[str] = deque(maxlen=MAX_LOG_LINES)
+
 class TaskRegistry:
+    __slots__ = ("slots", "_lock", "_log_q", "_drain_task")
+
     def __init__(self):
-        self.tasks: Dict[int, asyncio.Task] = {}
-        self.logs: Dict[int, List[str]] = {}
-        self.task_info: Dict[int, dict] = {}  # Store task metadata
+        # One slot per strategy id, so status/listing paths do a single lookup
+        self.slots: Dict[int, _Slot] = {}
         self._lock = asyncio.Lock()
+        # Single queue + drain coroutine shared by all strategy log() callables
+        self._log_q: Optional[asyncio.Queue] = None
+        self._drain_task: Optional[asyncio.Task] = None
+
+    def _slot(self, sid: int) -> _Slot:
+        """Get the slot for a strategy, creating it on first use (e.g. logs before add)."""
+        slot = self.slots.get(sid)
+        if slot is None:
+            slot = self.slots[sid] = _Slot()
+        return slot
+
+    def _append_log(self, sid: int, msg: str):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self._slot(sid).logs.append(f"[{timestamp}] {msg}")
 
     async def log(self, sid: int, msg: str):
         """Add a log message for a strategy."""
-        async with self._lock:
-            if sid not in self.logs:
-                self.logs[sid] = []
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            self.logs[sid].append(f"[{timestamp}] {msg}")
+        # Appending is synchronous, so no lock is needed (and taking one here
+        # would deadlock cancel(), which logs while holding the lock).
+        self._append_log(sid, msg)
+
+    def make_logger(self, sid: int) -> Callable[[str], None]:
+        """
+        Build the log(msg) callable handed to strategy code.
+
+        Safe to call from the event loop or from ib_async callback threads:
+        messages are queued with call_soon_threadsafe and written by a single
+        drain coroutine instead of spawning a task per message.
+        """
+        loop = asyncio.get_running_loop()
+        if self._drain_task is None or self._drain_task.done():
+            self._log_q = asyncio.Queue()
+            self._drain_task = loop.create_task(self._drain_logs(self._log_q))
+        put = self._log_q.put_nowait
+
+        def log(msg: str):
+            loop.call_soon_threadsafe(put, (sid, msg))
+
+        return log
+
+    async def _drain_logs(self, queue: asyncio.Queue):
+        """Write queued strategy log messages for as long as the loop runs."""
+        while True:
+            sid, msg = await queue.get()
+            self._append_log(sid, msg)
 
     def get_logs(self, sid: int) -> List[str]:
         """Get logs for a strategy."""
-        return self.logs.get(sid, [])
+        slot = self.slots.get(sid)
+        return list(slot.logs) if slot else []
 
     async def add(self, sid: int, task: asyncio.Task, task_info: dict):
         """Add a running task with metadata."""
         async with self._lock:
-            self.tasks[sid] = task
-            self.task_info[sid] = task_info
+            slot = self._slot(sid)
+            slot.task = task
+            slot.info = task_info
 
     def is_running(self, sid: int) -> bool:
         """Check if a strategy is running."""
-        task = self.tasks.get(sid)
-        return task is not None and not task.done()
+        slot = self.slots.get(sid)
+        return slot is not None and slot.task is not None and not slot.task.done()
 
     def get_task_info(self, sid: int) -> Optional[dict]:
         """Get task metadata."""
-        return self.task_info.get(sid)
+        slot = self.slots.get(sid)
+        return slot.info if slot else None
 
     def get_all_running_tasks(self) -> Dict[int, dict]:
         """Get all running tasks with their metadata."""
         running_tasks = {}
-        for sid, task in self.tasks.items():
-            if not task.done():
-                running_tasks[sid] = self.task_info.get(sid, {})
+        for sid, slot in self.slots.items():
+            if slot.task is not None and not slot.task.done():
+                running_tasks[sid] = slot.info or {}
         return running_tasks
 
     async def cancel(self, sid: int) -> bool:
         """Cancel a running strategy."""
         async with self._lock:
-            task = self.tasks.get(sid)
+            slot = self.slots.get(sid)
+            task = slot.task if slot else None
             if task and not task.done():
                 task.cancel()
                 try:
@@ -84,18 +141,43 @@ class TaskRegistry:
                 return True
             return False
 
-    async def cleanup(self, sid: int):
-        """Clean up completed tasks."""
-        async with self._lock:
-            task = self.tasks.get(sid)
-            if task and task.done():
-                del self.tasks[sid]
-                if sid in self.task_info:
-                    del self.task_info[sid]
+    def cleanup(self, sid: int):
+        """
+        Clean up a finished task (logs are kept for later viewing).
+
+        Only called from run_strategy's finally block, so the task is known to
+        be finishing and no done() check or lock is needed. The slot is only
+        cleared if it still holds the calling task: a redeploy of the same sid
+        while this one was finishing has already registered its own task.
+        """
+        slot = self.slots.get(sid)
+        if slot and slot.task is asyncio.current_task():
+            slot.task = None
+            slot.info = None
 
 # Global task registry
 task_registry = TaskRegistry()
 
+@dataclass(frozen=True, slots=True)
+class StrategyParams:
+    """Run metadata parsed once from the raw strategy params dict."""
+    strategy_name: str
+    tickers: List[str]
+    accounts: List[str]
+    paper_trading: bool
+    deployment_id: Optional[int]
+
+    @classmethod
+    def from_params(cls, sid: int, params: dict) -> "StrategyParams":
+        """Build from raw params, applying the same defaults used across the runner."""
+        return cls(
+            strategy_name=params.get("strategy_name", f"Strategy-{sid}"),
+            tickers=params.get("tickers", []),
+            accounts=params.get("accounts", []),
+            paper_trading=params.get("paper_trading", True),
+            deployment_id=params.get("deployment_id"),
+        )
+
 def set_process_title(title: str):
     """Set the process title for better Task Manager visibility."""
     try:
@@ -151,7 +233,8 @@ def create_task_manager_description(strategy_name: str, strategy_id: int, ticker
     description = f"Options Strategy: {strategy_name} (ID: {strategy_id}) | {trading_mode} | Tickers: {ticker_str} | Accounts: {account_str} | Deployment: {deployment_id}"
     return description
 
-async def run_strategy(sid: int, strategy_code: str, params: dict):
+async def run_strategy(sid: int, strategy_code: str, params: dict,
+                       run_params: Optional[StrategyParams] = None):
     """
     Run a strategy asynchronously.
     
@@ -159,17 +242,17 @@ async def run_strategy(sid: int, strategy_code: str, params: dict):
         sid: Strategy ID
         strategy_code: Python code containing the strategy
         params: Strategy parameters (including paper_trading flag and deployment_id)
+        run_params: Pre-parsed run metadata; parsed from params if omitted
     """
     start_time = time.time()
-    deployment_id = params.get("deployment_id")
-    strategy_name = params.get("strategy_name", f"Strategy-{sid}")
-    tickers = params.get("tickers", [])
-    accounts = params.get("accounts", [])
-    paper_trading = params.get("paper_trading", True)
+    p = run_params or StrategyParams.from_params(sid, params)
+    deployment_id = p.deployment_id
+    accounts = p.accounts
+    paper_trading = p.paper_trading
     
     # Create descriptive process title for Task Manager
     process_title = create_task_manager_description(
-        strategy_name, sid, tickers, accounts, paper_trading, deployment_id
+        p.strategy_name, sid, p.tickers, accounts, paper_trading, deployment_id
     )
     
     # Set the process title
@@ -191,12 +274,13 @@ async def run_strategy(sid: int, strategy_code: str, params: dict):
         ib = IBManager.instance().ib  # get the managed connection
         await task_registry.log(sid, f"Using managed IBKR connection via connection manager ({trading_type} trading)")
 
-        # Create log function
-        def log(msg: str):
-            asyncio.create_task(task_registry.log(sid, msg))
+        # Create log function (thread-safe, no task per message)
+        log = task_registry.make_logger(sid)
 
         # Run strategy
-        await task_registry.log(sid, f"Starting strategy with params: {json.dumps(params, indent=2)}")
+        # Pretty-printing is only worth its cost when someone is debugging
+        params_str = json.dumps(params, indent=2 if config.DEBUG else None)
+        await task_registry.log(sid, f"Starting strategy with params: {params_str}")
         await strategy.run(ib, params, log)
         await task_registry.log(sid, "Strategy completed successfully")
         
@@ -212,13 +296,12 @@ async def run_strategy(sid: int, strategy_code: str, params: dict):
                 
                 # Try to get account values from IBKR
                 try:
-                    for account in accounts:
-                        # Get account summary
-                        account_values = ib.accountSummary(account)
-                        for value in account_values:
-                            if value.tag == "NetLiquidation":
-                                final_capital += float(value.value)
-                                break
+                    # One summary read for all accounts, indexed by account
+                    net_liq = {}
+                    for value in ib.accountSummary():
+                        if value.tag == "NetLiquidation":
+                            net_liq.setdefault(value.account, float(value.value))
+                    final_capital += sum(net_liq.get(account, 0.0) for account in accounts)
                 except Exception as e:
                     await task_registry.log(sid, f"Could not fetch account values: {e}")
                 
@@ -270,7 +353,7 @@ async def run_strategy(sid: int, strategy_code: str, params: dict):
     finally:
         # Reset process title when strategy completes
         set_process_title("Options Trading Strategy Runner (Idle)")
-        await task_registry.cleanup(sid)
+        task_registry.cleanup(sid)
 
 async def update_deployment_status(deployment_id: int, status_data: dict):
     """Update deployment status in the database."""
@@ -298,28 +381,26 @@ async def start_strategy(sid: int, strategy_code: str, params: dict) -> asyncio.
     Returns:
         asyncio.Task: The running task
     """
+    p = StrategyParams.from_params(sid, params)
+    deployment_id = p.deployment_id if p.deployment_id is not None else 0
+
     # Create task metadata for Task Manager visibility
     task_info = {
         "strategy_id": sid,
-        "strategy_name": params.get("strategy_name", f"Strategy-{sid}"),
-        "tickers": params.get("tickers", []),
-        "accounts": params.get("accounts", []),
-        "paper_trading": params.get("paper_trading", True),
-        "deployment_id": params.get("deployment_id"),
+        "strategy_name": p.strategy_name,
+        "tickers": p.tickers,
+        "accounts": p.accounts,
+        "paper_trading": p.paper_trading,
+        "deployment_id": p.deployment_id,
         "start_time": datetime.now().isoformat(),
-        "task_id": f"Task-{sid}-{params.get('deployment_id', 0)}",  # Use unique task identifier
+        "task_id": f"Task-{sid}-{deployment_id}",  # Use unique task identifier
         "process_id": os.getpid(),  # Use actual system process ID
         "task_manager_description": create_task_manager_description(
-            params.get("strategy_name", f"Strategy-{sid}"),
-            sid,
-            params.get("tickers", []),
-            params.get("accounts", []),
-            params.get("paper_trading", True),
-            params.get("deployment_id", 0)
+            p.strategy_name, sid, p.tickers, p.accounts, p.paper_trading, deployment_id
         )
     }
     
-    task = asyncio.create_task(run_strategy(sid, strategy_code, params))
+    task = asyncio.create_task(run_strategy(sid, strategy_code, params, p))
     await task_registry.add(sid, task, task_info)
     return task
 
@@ -10,8 +10,46 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2 import pool
+from psycopg2.extras import RealDictCursor, execute_values
 from pathlib import Path
+from contextlib import contextmanager
+from collections import deque
+
+# Per-process constants, resolved once instead of on every launch/stop
+_IS_WINDOWS = platform.system() == "Windows"
+_HOSTNAME = platform.node()
+
+# Main loop cadence (monitor/heartbeats) and the fallback claim poll used in
+# case a NOTIFY is missed or LISTEN is unavailable
+_TICK_INTERVAL = 2
+_CLAIM_FALLBACK_INTERVAL = 30
+_CLAIM_BATCH = 32
+
+# Pooled DB connections; ThreadedConnectionPool raises PoolError past the max
+_POOL_MIN = 2
+_POOL_MAX = 10
+
+# update_run_status shapes (sorted names of the non-None fields) that get a
+# server-side prepared statement; anything else uses the dynamic UPDATE
+_PREPARED_RUN_UPDATES = {
+    (): "upd_run_status",
+    ("exit_code",): "upd_run_exit",
+    ("host", "pid", "started_at"): "upd_run_started",
+    ("exit_code", "stopped_at"): "upd_run_stopped",
+}
+
+def _run_update_sql(fields: tuple) -> str:
+    """UPDATE runs taking $1=status, then fields in order, then updated_at and id"""
+    sets = ["status = $1"] + [f"{name} = ${i}" for i, name in enumerate(fields, 2)]
+    n = len(fields) + 2
+    sets.append(f"updated_at = ${n}")
+    where = f"id = ${n + 1}"
+    if not fields:
+        # Status-only update: skip the write (and its WAL record) if the row already
+        # holds it, whoever wrote it last
+        where += " AND status IS DISTINCT FROM $1"
+    return f"UPDATE runs SET {', '.join(sets)} WHERE {where}"
 
 class RunnerService:
     """Supervisor service for managing strategy processes"""
@@ -22,167 +60,302 @@ class RunnerService:
         self.running_processes: Dict[int, subprocess.Popen] = {}
         self.process_info: Dict[int, Dict] = {}
         self.running = True
+        # Pooled connections: avoids a TCP + auth handshake per query
+        self._pool = pool.ThreadedConnectionPool(_POOL_MIN, _POOL_MAX, dsn=self.db_url)
+        # Run events are buffered and written once per loop tick
+        self._event_buffer: deque = deque()
+        # Snapshot of the environment, merged into each child's env at launch
+        self._base_env: Dict[str, str] = dict(os.environ)
+        # Pooled connections that already hold the PREPAREd run updates
+        self._prepared_conns: set = set()
+        # LISTEN connection and the event its notifications set
+        self._listen_conn = None
+        self._listen_fd = -1
+        self._new_run = asyncio.Event()
+        # pidfds of watched children; set by the loop so exits wake it (Linux only)
+        self._pidfds: Dict[int, int] = {}
+        self._wake = asyncio.Event()
+        # Per-run log files live here; created once rather than on every launch
+        self._log_dir = Path("logs")
+        self._log_dir.mkdir(exist_ok=True)
         
     def get_db_connection(self):
         """Get PostgreSQL connection"""
         return psycopg2.connect(self.db_url)
     
+    @contextmanager
+    def _conn(self):
+        """Borrow a pooled connection; commit on success, roll back on error"""
+        conn = self._pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.putconn(conn)
+    
+    def close(self):
+        """Close all pooled database connections"""
+        self._pool.closeall()
+        self._prepared_conns.clear()
+    
+    def _ensure_prepared(self, conn, cursor):
+        """PREPARE the hot run UPDATEs once per pooled connection"""
+        if conn in self._prepared_conns:
+            return
+        # Prepared statements are per session; DEALLOCATE keeps a retry idempotent
+        cursor.execute("DEALLOCATE ALL")
+        for fields, name in _PREPARED_RUN_UPDATES.items():
+            cursor.execute(f"PREPARE {name} AS {_run_update_sql(fields)}")
+        self._prepared_conns.add(conn)
+    
     def create_tables(self):
         """Create new tables for process management"""
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
-        # Create runs table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS runs (
-                id SERIAL PRIMARY KEY,
-                strategy_id INTEGER NOT NULL,
-                requested_by TEXT,
-                cfg JSONB DEFAULT '{}',
-                status TEXT DEFAULT 'pending',
-                pid INTEGER,
-                host TEXT,
-                started_at TIMESTAMPTZ,
-                stopped_at TIMESTAMPTZ,
-                last_heartbeat TIMESTAMPTZ,
-                exit_code INTEGER,
-                notes TEXT,
-                created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create run_events table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS run_events (
-                id SERIAL PRIMARY KEY,
-                run_id INTEGER NOT NULL,
-                ts TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                level TEXT NOT NULL,
-                message TEXT NOT NULL
-            )
-        """)
-        
-        # Create indexes
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_status ON runs(status)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_heartbeat ON runs(last_heartbeat)")
+        with self._conn() as conn, conn.cursor() as cursor:
+            # Create runs table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    id SERIAL PRIMARY KEY,
+                    strategy_id INTEGER NOT NULL,
+                    requested_by TEXT,
+                    cfg JSONB DEFAULT '{}',
+                    status TEXT DEFAULT 'pending',
+                    pid INTEGER,
+                    host TEXT,
+                    started_at TIMESTAMPTZ,
+                    stopped_at TIMESTAMPTZ,
+                    last_heartbeat TIMESTAMPTZ,
+                    exit_code INTEGER,
+                    notes TEXT,
+                    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
+            # Create run_events table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS run_events (
+                    id SERIAL PRIMARY KEY,
+                    run_id INTEGER NOT NULL,
+                    ts TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                    level TEXT NOT NULL,
+                    message TEXT NOT NULL
+                )
+            """)
+            
+            # Create indexes
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_status ON runs(status)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_heartbeat ON runs(last_heartbeat)")
+            
+            # Notify listening runners as soon as a run is inserted. Runners starting
+            # together serialize on an advisory lock (released at commit) so the
+            # function/trigger DDL below never races.
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext('runs_notify'))")
+            cursor.execute("""
+                CREATE OR REPLACE FUNCTION notify_new_run() RETURNS trigger AS $$
+                BEGIN
+                    PERFORM pg_notify('new_run', NEW.id::text);
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql
+            """)
+            # Create only if missing: no DROP, so inserts are never left without it
+            cursor.execute("""
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (
+                        SELECT 1 FROM pg_trigger
+                        WHERE tgname = 'runs_notify' AND tgrelid = 'runs'::regclass
+                    ) THEN
+                        CREATE TRIGGER runs_notify AFTER INSERT ON runs
+                        FOR EACH ROW EXECUTE FUNCTION notify_new_run();
+                    END IF;
+                END
+                $$
+            """)
         
-        conn.commit()
-        conn.close()
         print("✅ Runner service tables created")
     
     def add_event(self, run_id: int, level: str, message: str):
-        """Add event to run_events table"""
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO run_events (run_id, level, message) VALUES (?, ?, ?)",
-            (run_id, level, message)
-        )
-        conn.commit()
-        conn.close()
+        """Queue an event for the run_events table (written by _flush_events)"""
+        self._event_buffer.append((run_id, level, message, datetime.now()))
+    
+    def _flush_events(self):
+        """Write all buffered events in a single batched INSERT"""
+        if not self._event_buffer:
+            return
+        # popleft is atomic, so events added from other threads meanwhile are kept
+        rows = [self._event_buffer.popleft() for _ in range(len(self._event_buffer))]
+        try:
+            with self._conn() as conn, conn.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    "INSERT INTO run_events (run_id, level, message, ts) VALUES %s",
+                    rows,
+                    page_size=500
+                )
+        except Exception:
+            # Keep the events for the next tick
+            self._event_buffer.extendleft(reversed(rows))
+            raise
     
     def update_run_status(self, run_id: int, status: str, **kwargs):
         """Update run status and other fields"""
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
+        present = tuple(sorted(k for k, v in kwargs.items() if v is not None))
+        name = _PREPARED_RUN_UPDATES.get(present)
         
-        # Build update query dynamically
-        fields = []
-        values = []
-        for key, value in kwargs.items():
-            if value is not None:
-                fields.append(f"{key} = %s")
-                values.append(value)
-        
-        if fields:
-            fields.append("status = %s")
-            fields.append("updated_at = %s")
-            values.extend([status, datetime.now()])
-            
-            query = f"UPDATE runs SET {', '.join(fields)} WHERE id = %s"
-            values.append(run_id)
-            cursor.execute(query, values)
-        else:
-            cursor.execute(
-                "UPDATE runs SET status = %s, updated_at = %s WHERE id = %s",
-                (status, datetime.now(), run_id)
-            )
+        with self._conn() as conn, conn.cursor() as cursor:
+            if name:
+                # Known shape: reuse the server-side plan
+                self._ensure_prepared(conn, cursor)
+                args = [status] + [kwargs[k] for k in present] + [datetime.now(), run_id]
+                cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(args))})", args)
+            else:
+                # Fallback: build update query dynamically
+                fields = [f"{key} = %s" for key in present]
+                values = [kwargs[key] for key in present]
+                fields.append("status = %s")
+                fields.append("updated_at = %s")
+                values.extend([status, datetime.now(), run_id])
+                
+                query = f"UPDATE runs SET {', '.join(fields)} WHERE id = %s"
+                cursor.execute(query, values)
+    
+    def _start_listener(self, loop: asyncio.AbstractEventLoop) -> bool:
+        """LISTEN for new runs so the main loop wakes as soon as one is inserted"""
+        conn = None
+        try:
+            conn = self.get_db_connection()
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute("LISTEN new_run")
+            # Not supported by the Windows proactor loop; we fall back to polling there
+            fd = conn.fileno()
+            loop.add_reader(fd, self._on_notify)
+        except Exception as e:
+            print(f"⚠️ LISTEN/NOTIFY unavailable, polling for pending runs instead: {e}")
+            if conn is not None:
+                conn.close()
+            return False
         
-        conn.commit()
-        conn.close()
+        self._listen_conn = conn
+        self._listen_fd = fd
+        return True
+    
+    def _on_notify(self):
+        """Reader callback for the LISTEN connection"""
+        try:
+            self._listen_conn.poll()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            # Connection lost: drop it; the main loop polls and re-LISTENs next tick
+            print(f"⚠️ LISTEN connection lost, reconnecting: {e}")
+            self._stop_listener(asyncio.get_running_loop())
+            self._wake.set()
+            return
+        if self._listen_conn.notifies:
+            self._listen_conn.notifies.clear()
+            self._new_run.set()
+            self._wake.set()
     
-    def get_pending_runs(self) -> List[Dict]:
-        """Get all pending runs"""
-        conn = self.get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("SELECT * FROM runs WHERE status = 'pending'")
+    def _stop_listener(self, loop: asyncio.AbstractEventLoop):
+        if self._listen_conn is None:
+            return
+        try:
+            # The fd recorded at LISTEN time; fileno() fails once the connection breaks
+            loop.remove_reader(self._listen_fd)
+        finally:
+            self._listen_conn.close()
+            self._listen_conn = None
+    
+    def _watch_exit(self, loop: asyncio.AbstractEventLoop, run_id: int):
+        """Wake the loop when a child exits instead of polling it every tick"""
+        process = self.running_processes.get(run_id)
+        if process is None or run_id in self._pidfds or not hasattr(os, "pidfd_open"):
+            return
+        try:
+            fd = os.pidfd_open(process.pid)
+        except OSError:
+            # Old kernel (or the child is already gone); monitor_processes polls it
+            return
+        try:
+            loop.add_reader(fd, self._on_child_exit, loop, run_id)
+        except (NotImplementedError, OSError):
+            os.close(fd)
+            return
+        self._pidfds[run_id] = fd
+    
+    def _unwatch_exit(self, loop: asyncio.AbstractEventLoop, run_id: int):
+        fd = self._pidfds.pop(run_id, None)
+        if fd is not None:
+            loop.remove_reader(fd)
+            os.close(fd)
+    
+    def _on_child_exit(self, loop: asyncio.AbstractEventLoop, run_id: int):
+        """Reader callback: the pidfd turns readable once the child exits"""
+        # Dropping the watcher hands the run back to monitor_processes, which reaps it
+        self._unwatch_exit(loop, run_id)
+        self._wake.set()
+    
+    def claim_pending_runs(self, limit: int = _CLAIM_BATCH) -> List[Dict]:
+        """Atomically claim up to `limit` pending runs and return them"""
+        # SKIP LOCKED lets several runner instances claim concurrently without
+        # double-launching; select + claim is a single round trip.
+        with self._conn() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute("""
+                UPDATE runs SET status = 'starting', updated_at = %s
+                WHERE id IN (
+                    SELECT id FROM runs WHERE status = 'pending'
+                    ORDER BY id
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT %s
+                )
+                RETURNING *
+            """, (datetime.now(), limit))
+            runs = cursor.fetchall()
         
-        runs = cursor.fetchall()
         # Convert RealDictRow to regular dict and handle JSONB
         runs = [dict(run) for run in runs]
         for run in runs:
             # JSONB is already parsed by psycopg2
             if run['cfg'] is None:
                 run['cfg'] = {}
+            self.add_event(run['id'], "info", "Run claimed by runner service")
         
-        conn.close()
         return runs
     
-    def claim_run(self, run_id: int) -> bool:
-        """Atomically claim a pending run"""
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "UPDATE runs SET status = 'starting', updated_at = %s WHERE id = %s AND status = 'pending'",
-            (datetime.now(), run_id)
-        )
-        
-        claimed = cursor.rowcount > 0
-        if claimed:
-            conn.commit()
-            self.add_event(run_id, "info", "Run claimed by runner service")
-        
-        conn.close()
-        return claimed
-    
     def launch_strategy(self, run: Dict) -> Optional[int]:
         """Launch a strategy process"""
         try:
-            # Prepare environment
-            env = os.environ.copy()
+            # Prepare environment: base env + run cfg + strategy-specific values
             cfg = run.get('cfg', {})
-            for key, value in cfg.items():
-                env[key.upper()] = str(value)
-            
-            # Add strategy-specific environment
-            env['STRATEGY_ID'] = str(run['strategy_id'])
-            env['RUN_ID'] = str(run['id'])
-            env['STRATEGY_NAME'] = run.get('strategy_name', 'Unknown')
+            env = {
+                **self._base_env,
+                **{key.upper(): str(value) for key, value in cfg.items()},
+                'STRATEGY_ID': str(run['strategy_id']),
+                'RUN_ID': str(run['id']),
+                'STRATEGY_NAME': run.get('strategy_name', 'Unknown'),
+            }
             
-            # Create log directory
-            log_dir = Path("logs")
-            log_dir.mkdir(exist_ok=True)
-            log_file = log_dir / f"run_{run['id']}.log"
+            log_file = self._log_dir / f"run_{run['id']}.log"
             
             # Launch process
-            if platform.system() == "Windows":
+            if _IS_WINDOWS:
                 CREATE_NEW_PROCESS_GROUP = 0x00000200
-                process = subprocess.Popen(
-                    [sys.executable, "-m", "strategies.runner", "--run-id", str(run['id'])],
-                    env=env,
-                    stdout=open(log_file, 'w'),
-                    stderr=subprocess.STDOUT,
-                    creationflags=CREATE_NEW_PROCESS_GROUP
-                )
+                group_kwargs = {'creationflags': CREATE_NEW_PROCESS_GROUP}
             else:
+                group_kwargs = {'start_new_session': True}
+            
+            # The child gets its own copy of the log fd; close ours right away.
+            # Append (unbuffered) so a relaunch keeps the earlier output.
+            with open(log_file, 'ab', buffering=0) as log_fh:
                 process = subprocess.Popen(
                     [sys.executable, "-m", "strategies.runner", "--run-id", str(run['id'])],
                     env=env,
-                    stdout=open(log_file, 'w'),
+                    stdout=log_fh,
                     stderr=subprocess.STDOUT,
-                    start_new_session=True
+                    **group_kwargs
                 )
             
             pid = process.pid
@@ -198,7 +371,7 @@ class RunnerService:
                 run['id'], 
                 'running',
                 pid=pid,
-                host=platform.node(),
+                host=_HOSTNAME,
                 started_at=datetime.now()
             )
             
@@ -212,18 +385,18 @@ class RunnerService:
             print(f"❌ Failed to launch strategy {run['id']}: {e}")
             return None
     
-    def stop_strategy(self, run_id: int, grace_period: int = 20) -> bool:
+    async def stop_strategy(self, run_id: int, grace_period: int = 20) -> bool:
         """Stop a running strategy gracefully"""
         if run_id not in self.running_processes:
             return False
         
         try:
             process = self.running_processes[run_id]
-            self.update_run_status(run_id, 'stopping')
+            await asyncio.to_thread(self.update_run_status, run_id, 'stopping')
             self.add_event(run_id, "info", f"Stopping strategy (grace period: {grace_period}s)")
             
             # Send termination signal
-            if platform.system() == "Windows":
+            if _IS_WINDOWS:
                 # Windows: GenerateConsoleCtrlEvent for graceful shutdown
                 try:
                     import win32api
@@ -232,21 +405,21 @@ class RunnerService:
                 except ImportError:
                     process.terminate()
             else:
-                # Unix: Send SIGTERM
-                os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+                # Unix: SIGTERM the whole group (start_new_session=True => PGID == PID)
+                os.killpg(process.pid, signal.SIGTERM)
             
-            # Wait for graceful shutdown
+            # Wait for graceful shutdown (in a worker thread so other stops proceed)
             try:
-                process.wait(timeout=grace_period)
+                await asyncio.to_thread(process.wait, timeout=grace_period)
                 exit_code = process.returncode
             except subprocess.TimeoutExpired:
                 # Force kill if grace period exceeded
                 self.add_event(run_id, "warn", f"Grace period exceeded, force killing process")
-                if platform.system() == "Windows":
+                if _IS_WINDOWS:
                     process.kill()
                 else:
-                    os.killpg(os.getpgid(process.pid), signal.SIGKILL)
-                process.wait()
+                    os.killpg(process.pid, signal.SIGKILL)
+                await asyncio.to_thread(process.wait)
                 exit_code = -1
             
             # Cleanup
@@ -255,7 +428,8 @@ class RunnerService:
                 del self.process_info[run_id]
             
             # Update database
-            self.update_run_status(
+            await asyncio.to_thread(
+                self.update_run_status,
                 run_id, 
                 'stopped',
                 stopped_at=datetime.now(),
@@ -268,25 +442,35 @@ class RunnerService:
             
         except Exception as e:
             self.add_event(run_id, "error", f"Error stopping strategy: {str(e)}")
-            self.update_run_status(run_id, 'error')
+            await asyncio.to_thread(self.update_run_status, run_id, 'error')
             print(f"❌ Error stopping strategy {run_id}: {e}")
             return False
     
     def check_heartbeats(self):
         """Check for stale heartbeats and mark dead processes"""
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
         # Find runs with stale heartbeats (more than 30 seconds old)
         stale_threshold = datetime.now() - timedelta(seconds=30)
-        cursor.execute(
-            "SELECT id, pid FROM runs WHERE status = 'running' AND (last_heartbeat IS NULL OR last_heartbeat < %s)",
-            (stale_threshold,)
-        )
+        with self._conn() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT id, pid FROM runs WHERE status = 'running' AND (last_heartbeat IS NULL OR last_heartbeat < %s)",
+                (stale_threshold,)
+            )
+            stale_runs = cursor.fetchall()
         
-        stale_runs = cursor.fetchall()
         for run_id, pid in stale_runs:
-            if pid and not psutil.pid_exists(pid):
+            if run_id in self._pidfds:
+                # Its pidfd watcher reports the exit; monitor_processes then records
+                # the real exit code, so don't reap it here as 'dead'
+                continue
+            process = self.running_processes.get(run_id)
+            if process is not None:
+                # Our own child: poll() is cheap and immune to PID reuse
+                dead = process.poll() is not None
+            else:
+                # Launched by another runner instance: fall back to a PID probe
+                dead = bool(pid) and not psutil.pid_exists(pid)
+            
+            if dead:
                 # Process is dead
                 self.update_run_status(run_id, 'dead', exit_code=-1)
                 self.add_event(run_id, "error", "Process died unexpectedly")
@@ -297,21 +481,19 @@ class RunnerService:
                     del self.running_processes[run_id]
                 if run_id in self.process_info:
                     del self.process_info[run_id]
-        
-        conn.close()
     
     def monitor_processes(self):
         """Monitor running processes and update status"""
+        finished = []
         for run_id, process in list(self.running_processes.items()):
+            if run_id in self._pidfds:
+                # Still running; its pidfd wakes the loop when it exits
+                continue
             if process.poll() is not None:
                 # Process has finished
                 exit_code = process.returncode
-                self.update_run_status(
-                    run_id, 
-                    'stopped',
-                    stopped_at=datetime.now(),
-                    exit_code=exit_code
-                )
+                now = datetime.now()
+                finished.append(('stopped', exit_code, now, now, run_id))
                 
                 if exit_code == 0:
                     self.add_event(run_id, "info", "Strategy completed successfully")
@@ -324,28 +506,68 @@ class RunnerService:
                     del self.process_info[run_id]
                 
                 print(f"📋 Strategy {run_id} finished with exit code {exit_code}")
+        
+        # One transaction for all runs that finished this tick (events are flushed with the tick)
+        if finished:
+            with self._conn() as conn, conn.cursor() as cursor:
+                self._ensure_prepared(conn, cursor)
+                cursor.executemany(
+                    "EXECUTE upd_run_stopped (%s, %s, %s, %s, %s)",
+                    finished
+                )
     
     async def run(self):
         """Main runner loop"""
         print("🚀 Starting Runner Service...")
-        self.create_tables()
+        # Blocking psycopg2 work runs in worker threads so the loop stays responsive
+        await asyncio.to_thread(self.create_tables)
+        
+        loop = asyncio.get_running_loop()
+        listening = self._start_listener(loop)
+        last_claim = float("-inf")
         
         while self.running:
             try:
-                # Check for pending runs
-                pending_runs = self.get_pending_runs()
-                for run in pending_runs:
-                    if self.claim_run(run['id']):
-                        self.launch_strategy(run)
+                self._wake.clear()
+                
+                # Re-LISTEN after the connection dropped; claim whatever was
+                # inserted while it was down
+                if listening and self._listen_conn is None and self._start_listener(loop):
+                    self._new_run.set()
+                
+                # Claim and launch pending runs when notified (or on the fallback poll)
+                now = time.monotonic()
+                if (self._new_run.is_set() or self._listen_conn is None or
+                        now - last_claim >= _CLAIM_FALLBACK_INTERVAL):
+                    self._new_run.clear()
+                    last_claim = now
+                    claimed = await asyncio.to_thread(self.claim_pending_runs)
+                    if len(claimed) == _CLAIM_BATCH:
+                        # More may be waiting; claim again on the next tick
+                        self._new_run.set()
+                        self._wake.set()
+                    for run in claimed:
+                        await asyncio.to_thread(self.launch_strategy, run)
+                        self._watch_exit(loop, run['id'])
                 
                 # Monitor existing processes
-                self.monitor_processes()
+                await asyncio.to_thread(self.monitor_processes)
                 
                 # Check heartbeats
-                self.check_heartbeats()
+                await asyncio.to_thread(self.check_heartbeats)
+                
+                # Drop watchers for runs that were reaped or stopped elsewhere
+                for run_id in [r for r in self._pidfds if r not in self.running_processes]:
+                    self._unwatch_exit(loop, run_id)
                 
-                # Wait before next iteration
-                await asyncio.sleep(2)
+                # Persist events recorded during this tick
+                await asyncio.to_thread(self._flush_events)
+                
+                # Wait for the next tick, waking early if a run is submitted or a child exits
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=_TICK_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
                 
             except KeyboardInterrupt:
                 print("\n🛑 Shutting down Runner Service...")
@@ -355,10 +577,31 @@ class RunnerService:
                 print(f"❌ Runner Service error: {e}")
                 await asyncio.sleep(5)
         
-        # Cleanup: stop all running processes
-        for run_id in list(self.running_processes.keys()):
-            self.stop_strategy(run_id, grace_period=5)
+        self._stop_listener(loop)
+        for run_id in list(self._pidfds):
+            self._unwatch_exit(loop, run_id)
+        
+        # Cleanup: stop running processes concurrently, but never with more
+        # stops in flight than the pool has connections
+        limit = asyncio.Semaphore(_POOL_MAX)
         
+        async def _stop(run_id: int) -> bool:
+            async with limit:
+                return await self.stop_strategy(run_id, grace_period=5)
+        
+        run_ids = list(self.running_processes.keys())
+        try:
+            results = await asyncio.gather(*(_stop(run_id) for run_id in run_ids),
+                                           return_exceptions=True)
+            for run_id, result in zip(run_ids, results):
+                if isinstance(result, BaseException):
+                    print(f"❌ Failed to stop strategy {run_id} during shutdown: {result}")
+        finally:
+            try:
+                await asyncio.to_thread(self._flush_events)
+            except Exception as e:
+                print(f"❌ Failed to write pending run events: {e}")
+            self.close()
         print("✅ Runner Service stopped")
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 import asyncio
 import logging
+import time
 from datetime import datetime
 
 from .connection_manager import connection_manager
@@ -29,9 +30,14 @@ class Strategy(ABC):
     
     def __init__(self):
         self.connection_status = "disconnected"
-        self.last_connection_check = None
+        self.last_connection_check = None  # wall-clock time, for reporting only
+        self._last_check_mono: Optional[float] = None  # monotonic time of last successful check
         self.connection_check_interval = 60  # seconds
         self._connection_callback_registered = False
+        # Set while connected; lets wait_for_connection sleep until a status change
+        self._connected_event = asyncio.Event()
+        # (connection_manager.version, summary) from the last get_connection_info
+        self._summary_cache: Optional[tuple] = None
     
     async def ensure_connection(self) -> bool:
         """
@@ -42,8 +48,8 @@ class Strategy(ABC):
         """
         try:
             # Check if we need to verify connection
-            if (self.last_connection_check and 
-                (datetime.now() - self.last_connection_check).seconds < self.connection_check_interval):
+            if (self._last_check_mono is not None and
+                time.monotonic() - self._last_check_mono < self.connection_check_interval):
                 return connection_manager.is_connected(self.required_connection_type)
             
             # Try to get or establish connection
@@ -51,7 +57,8 @@ class Strategy(ABC):
             
             if success:
                 self.connection_status = "connected"
-                self.last_connection_check = datetime.now()
+                self._mark_connection_checked()
+                self._connected_event.set()
                 logger.info(f"Strategy {self.name}: Connection established ({self.required_connection_type})")
                 return True
             else:
@@ -59,7 +66,8 @@ class Strategy(ABC):
                 alternative_type = "real" if self.required_connection_type == "paper" else "paper"
                 if await connection_manager.ensure_connection(alternative_type):
                     self.connection_status = "connected"
-                    self.last_connection_check = datetime.now()
+                    self._mark_connection_checked()
+                    self._connected_event.set()
                     logger.info(f"Strategy {self.name}: Using alternative connection ({alternative_type})")
                     return True
                 
@@ -72,6 +80,11 @@ class Strategy(ABC):
             self.connection_status = "error"
             return False
     
+    def _mark_connection_checked(self):
+        """Record a successful connection check."""
+        self._last_check_mono = time.monotonic()
+        self.last_connection_check = datetime.now()
+    
     def get_connection_info(self) -> Dict[str, Any]:
         """Get current connection information."""
         return {
@@ -79,9 +92,16 @@ class Strategy(ABC):
             "required_type": self.required_connection_type,
             "current_status": self.connection_status,
             "last_check": self.last_connection_check.isoformat() if self.last_connection_check else None,
-            "connection_manager_status": connection_manager.get_connection_summary()
+            "connection_manager_status": self._connection_summary()
         }
     
+    def _connection_summary(self) -> Dict[str, Any]:
+        """Connection manager summary, rebuilt only after a connection state change."""
+        version = connection_manager.version
+        if self._summary_cache is None or self._summary_cache[0] != version:
+            self._summary_cache = (version, connection_manager.get_connection_summary())
+        return self._summary_cache[1]
+    
     async def wait_for_connection(self, timeout: int = None) -> bool:
         """
         Wait for connection to be established.
@@ -95,13 +115,24 @@ class Strategy(ABC):
         if timeout is None:
             timeout = self.connection_timeout
         
-        start_time = datetime.now()
+        if self.is_connection_healthy():
+            return True
+        
+        # Status changes arrive via _on_connection_change, which sets the event;
+        # ensure_connection is still retried periodically in case none comes
+        self.register_connection_callback()
+        deadline = time.monotonic() + timeout
+        if await self.ensure_connection():
+            return True
         
-        while (datetime.now() - start_time).seconds < timeout:
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                await asyncio.wait_for(self._connected_event.wait(), min(2, remaining))
+                return True
+            except asyncio.TimeoutError:
+                pass
             if await self.ensure_connection():
                 return True
-            
-            await asyncio.sleep(2)  # Wait 2 seconds before retry
         
         logger.error(f"Strategy {self.name}: Connection timeout after {timeout} seconds")
         return False
@@ -119,8 +150,10 @@ class Strategy(ABC):
             
             if connection_info.status.value == "connected":
                 self.connection_status = "connected"
+                self._connected_event.set()
             elif connection_info.status.value in ["disconnected", "error"]:
                 self.connection_status = "disconnected"
+                self._connected_event.clear()
     
     @abstractmethod
     async def run(self, ib, params: dict, log):
@@ -3,6 +3,9 @@ Safely load and instantiate Strategy classes from user code.
 """
 import sys
 import os
+import hashlib
+import types
+import logging
 from typing import Dict, Any
 from strategies.base import Strategy
 import asyncio
@@ -12,6 +15,19 @@ from ib_async import (
     IB, Contract, Order, LimitOrder, MarketOrder, ComboLeg, Option
 )
 
+logger = logging.getLogger(__name__)
+
+# Compiled strategy code, keyed by SHA-256 of the source
+_CODE_CACHE: Dict[str, types.CodeType] = {}
+
+def _compile_cached(code: str) -> types.CodeType:
+    """Compile strategy source once; relaunching the same code reuses the code object."""
+    key = hashlib.sha256(code.encode("utf-8")).hexdigest()
+    code_obj = _CODE_CACHE.get(key)
+    if code_obj is None:
+        code_obj = _CODE_CACHE[key] = compile(code, f"<strategy {key[:8]}>", "exec")
+    return code_obj
+
 def load_strategy_from_code(code: str) -> Strategy:
     """
     Load a Strategy subclass from user code.
@@ -25,19 +41,13 @@ def load_strategy_from_code(code: str) -> Strategy:
     Raises:
         ValueError: If no Strategy subclass is found
     """
-    print(f"DEBUG: Loading strategy from code (length: {len(code)})")
-    print(f"DEBUG: Code preview: {code[:200]}...")
-    
+    logger.debug("Loading strategy from code (length: %d)", len(code))
     # Ensure the strategies directory is in the Python path
     current_dir = os.path.dirname(os.path.abspath(__file__))
     parent_dir = os.path.dirname(current_dir)
     if parent_dir not in sys.path:
         sys.path.insert(0, parent_dir)
     
-    print(f"DEBUG: Current directory: {current_dir}")
-    print(f"DEBUG: Parent directory: {parent_dir}")
-    print(f"DEBUG: Python path: {sys.path[:3]}...")
-    
     # Namespace exposed to the user strategy code
     ns: Dict[str, Any] = {
         "Strategy": Strategy,
@@ -51,37 +61,37 @@ def load_strategy_from_code(code: str) -> Strategy:
         "ComboLeg": ComboLeg,
         "Option": Option,
     }
-    
-    print(f"DEBUG: Strategy base class: {Strategy}")
-    print(f"DEBUG: Strategy base class type: {type(Strategy)}")
-    print(f"DEBUG: Strategy base class module: {Strategy.__module__}")
+
+    # Classes defined by the user code show up as new direct subclasses
+    before = set(Strategy.__subclasses__())
 
     try:
-        exec(code, ns)
-        print(f"DEBUG: Code executed successfully")
-        print(f"DEBUG: Namespace keys: {list(ns.keys())}")
-        print(f"DEBUG: Namespace values types: {[(k, type(v)) for k, v in ns.items() if k.startswith('NewStrategy') or k.startswith('strategy')]}")
+        exec(_compile_cached(code), ns)
     except Exception as e:
-        print(f"DEBUG: Code execution failed: {e}")
+        logger.debug("Strategy code execution failed: %s", e)
         raise ValueError(f"Failed to execute strategy code: {e}")
 
-    # Find first Strategy subclass
-    strategy_class = None
-    for obj_name, obj in ns.items():
-        if isinstance(obj, type) and issubclass(obj, Strategy) and obj is not Strategy:
-            print(f"DEBUG: Found Strategy subclass: {obj_name} = {obj}")
-            strategy_class = obj
-            break
+    # Find first Strategy subclass: new subclasses first, then scan the
+    # namespace (e.g. a class imported from an already-loaded module)
+    new_classes = [c for c in Strategy.__subclasses__() if c not in before]
+    strategy_class = new_classes[0] if new_classes else None
+    if strategy_class is None:
+        for obj_name, obj in ns.items():
+            if isinstance(obj, type) and issubclass(obj, Strategy) and obj is not Strategy:
+                strategy_class = obj
+                break
     
     if strategy_class is None:
-        print(f"DEBUG: No Strategy subclass found in namespace")
-        print(f"DEBUG: All namespace objects: {[(k, type(v)) for k, v in ns.items()]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("No Strategy subclass found; namespace: %s",
+                         [(k, type(v)) for k, v in ns.items()])
         raise ValueError("No Strategy subclass found in code")
+    logger.debug("Found Strategy subclass: %s", strategy_class)
 
     try:
         instance = strategy_class()
-        print(f"DEBUG: Successfully instantiated strategy: {instance}")
+        logger.debug("Instantiated strategy: %s", instance)
         return instance
     except Exception as e:
-        print(f"DEBUG: Failed to instantiate strategy: {e}")
+        logger.debug("Failed to instantiate strategy: %s", e)
         raise ValueError(f"Failed to instantiate strategy: {e}")
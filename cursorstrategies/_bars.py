@@ -0,0 +1,136 @@
+"""
+Bar-series helpers shared by the cursor strategies.
+"""
+
+import asyncio
+import itertools
+import weakref
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+class CloseBuffer:
+    """
+    Close prices of a keepUpToDate BarDataList held as one contiguous float64
+    array (the last slot is the still-forming bar).
+
+    Strategies update it once per new bar instead of rebuilding a close list
+    from the BarData objects; when full, history older than `keep` closes is
+    dropped so the buffer never grows.
+    """
+
+    __slots__ = ("_buf", "_n", "_keep")
+
+    def __init__(self, bars, keep: int, capacity: int = 1024):
+        self._keep = keep
+        self._buf = np.empty(max(capacity, 2 * keep), dtype=np.float64)
+        # Seed straight into the array from the most recent bars (no intermediate list)
+        n = min(len(bars), len(self._buf))
+        recent = itertools.islice(bars, len(bars) - n, None)
+        self._buf[:n] = np.fromiter((bar.close for bar in recent), dtype=np.float64, count=n)
+        self._n = n
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> float:
+        """Index from the end (-1 is the newest close)"""
+        return self._buf[self._n + i]
+
+    @property
+    def values(self) -> np.ndarray:
+        """View of the buffered closes, oldest first"""
+        return self._buf[:self._n]
+
+    def append(self, close: float):
+        n = self._n
+        if n == len(self._buf):
+            keep = self._keep
+            self._buf[:keep] = self._buf[n - keep:n]
+            n = keep
+        self._buf[n] = close
+        self._n = n + 1
+
+    def complete_last(self, close: float):
+        """Replace the forming bar's close with its final value"""
+        if self._n:
+            self._buf[self._n - 1] = close
+
+
+class HistoricalBarsCache:
+    """
+    One keepUpToDate historical-data subscription per (IB, contract, window),
+    shared by every strategy instance that asks for the same bars.
+
+    Subscribers are reference-counted; the IB subscription is cancelled when
+    the last one releases it. Entries are held per IB object (weakly), so a
+    discarded IB takes any unreleased ones with it and a new IB never sees them.
+    """
+
+    # IB -> {key -> [task resolving to the BarDataList, subscriber count]}
+    _entries: "weakref.WeakKeyDictionary[object, Dict[Tuple, list]]" = weakref.WeakKeyDictionary()
+    # IB -> {id(bars) -> key}, for release()
+    _keys: "weakref.WeakKeyDictionary[object, Dict[int, Tuple]]" = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def _key(contract, duration: str, bar_size: str, what_to_show: str, use_rth: bool) -> Tuple:
+        ident = contract.conId or (contract.symbol, contract.secType, contract.exchange, contract.currency)
+        return (ident, duration, bar_size, what_to_show, use_rth)
+
+    @classmethod
+    async def acquire(cls, ib, contract, duration: str, bar_size: str,
+                      what_to_show: str = 'TRADES', use_rth: bool = True):
+        """Return the shared BarDataList for this window, subscribing on first use"""
+        key = cls._key(contract, duration, bar_size, what_to_show, use_rth)
+        entries = cls._entries.setdefault(ib, {})
+        entry = entries.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(ib.reqHistoricalDataAsync(
+                contract,
+                endDateTime='',
+                durationStr=duration,
+                barSizeSetting=bar_size,
+                whatToShow=what_to_show,
+                useRTH=use_rth,
+                keepUpToDate=True,
+                formatDate=1
+            ))
+            entry = entries[key] = [task, 0]
+        entry[1] += 1
+
+        try:
+            # Concurrent callers for the same key await the one request
+            bars = await asyncio.shield(entry[0])
+        except BaseException:
+            cls._drop(ib, key)
+            raise
+        cls._keys.setdefault(ib, {})[id(bars)] = key
+        return bars
+
+    @classmethod
+    def release(cls, ib, bars):
+        """Drop one subscriber; cancels the IB subscription when none remain"""
+        keys = cls._keys.get(ib, {})
+        key = keys.get(id(bars))
+        if key is None:
+            return
+        if cls._drop(ib, key):
+            keys.pop(id(bars), None)
+            try:
+                ib.cancelHistoricalData(bars)
+            except Exception as e:
+                print(f"⚠️ cancelHistoricalData error: {e}")
+
+    @classmethod
+    def _drop(cls, ib, key: Tuple) -> bool:
+        """Decrement the subscriber count; True if the entry was removed"""
+        entries = cls._entries.get(ib, {})
+        entry = entries.get(key)
+        if entry is None:
+            return False
+        entry[1] -= 1
+        if entry[1] > 0:
+            return False
+        del entries[key]
+        return True
@@ -0,0 +1,55 @@
+"""
+Indicator kernels shared by the cursor strategies.
+
+Each kernel is a single loop over a float64 close array with no temporary
+arrays. They are compiled with Numba when it is installed; otherwise they run
+as plain Python, which is still fine for the short windows used here.
+"""
+
+import math
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - numba is optional
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+@njit(cache=True)
+def wilder_averages(close, period):
+    """Wilder-smoothed (average gain, average loss) over all of `close`; NaNs if too short.
+
+    The first `period` changes are averaged to seed the recursion, which then
+    runs over the rest of the series.
+    """
+    n = close.shape[0]
+    if n < period + 1:
+        return math.nan, math.nan
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, period + 1):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            gain += d
+        else:
+            loss -= d
+    gain /= period
+    loss /= period
+    for i in range(period + 1, n):
+        d = close[i] - close[i - 1]
+        gain = (gain * (period - 1) + (d if d > 0 else 0.0)) / period
+        loss = (loss * (period - 1) + (-d if d < 0 else 0.0)) / period
+    return gain, loss
+
+
+@njit(cache=True)
+def momentum_pct(close, period):
+    """Percent change from `period` bars back to the latest close; NaN if too short."""
+    n = close.shape[0]
+    if n < period:
+        return math.nan
+    past = close[n - period]
+    return (close[n - 1] - past) / past * 100.0
+
@@ -8,9 +8,13 @@ MNQ Futures Trading Strategy
 Implements a simple futures trading strategy for MNQ contracts
 """
 
-from datetime import datetime
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List
 import asyncio
+import math
+import time
+import types
+
+import numpy as np
 
 from ib_async import IB, Future, LimitOrder
 
@@ -32,6 +36,18 @@ except Exception:  # pragma: no cover
             self.ib: Optional[IB] = None
 
 
+_SNAP_CAPACITY = 2048
+# Minimum spacing of routine monitor snapshots (labelled ones are always kept)
+_SNAP_MONITOR_INTERVAL = 1.0
+# CME futures month codes, indexed by month - 1
+_MONTH_CODES = "FGHJKMNQUVXZ"
+_NAN = float("nan")
+
+
+def _num(x) -> float:
+    return _NAN if x is None else float(x)
+
+
 class FuturesMNQStrategy(Strategy):
     name = "FuturesMNQ"
 
@@ -40,14 +56,27 @@ class FuturesMNQStrategy(Strategy):
         self._running: bool = True
         self._in_trade: bool = False
         self._entry_price: Optional[float] = None
-        self._entry_time: Optional[datetime] = None
+        self._entry_time: Optional[float] = None  # time.monotonic() at entry
+        # exit trigger levels, fixed when the entry price is known
+        self._stop_px: Optional[float] = None
+        self._tp_px: Optional[float] = None
 
         self._contract: Optional[Future] = None
         self._ticker_stream = None   # Ticker from reqMktData
+        self._tick_event: Optional[asyncio.Event] = None  # set on ticker updates while monitoring
         self._tick_size: float = 0.25
-
-        # price snapshots
-        self._snapshots: List[Dict[str, Any]] = []
+        self._cfg: Optional[types.SimpleNamespace] = None  # run settings parsed from params
+
+        # price snapshots, stored column-wise (NaN = missing); when full the older
+        # half is dropped so a long session never grows them
+        self._snap_n = 0
+        self._snap_dropped = 0
+        self._last_recorded: Optional[Tuple] = None  # (bid, ask, last) of the latest snapshot
+        self._last_monitor_snap = float("-inf")  # time.monotonic() of the latest monitor snapshot
+        self._snap_ts = np.empty(_SNAP_CAPACITY, dtype="U12")
+        self._snap_label = np.empty(_SNAP_CAPACITY, dtype="U16")
+        self._snap_px = np.empty((_SNAP_CAPACITY, 3))  # bid, ask, last
+        self._snap_sz = np.empty((_SNAP_CAPACITY, 3))  # bidSize, askSize, lastSize
 
     # ------------------------------ Public API ------------------------------
 
@@ -67,9 +96,19 @@ class FuturesMNQStrategy(Strategy):
 
         avg_cost_is_price = bool(self.params.get("avg_cost_is_price", True))
 
+        # Order/exit settings are fixed for the run; parse them once
+        self._cfg = types.SimpleNamespace(
+            off=float(self.params.get("limit_offset", self.limit_offset)),
+            tif=str(self.params.get("tif", "DAY")).upper(),
+            limit_timeout=int(self.params.get("limit_timeout", 30)),
+            tp_mult=tp_mult,
+            qty=int(self.contract_size),
+            stop_loss=float(self.stop_loss_points),
+        )
+
         log(f"▶️  {self.name} for {symbol} {expiry} (acct={acct or 'DEFAULT'})")
         log(f"    contract_size={self.contract_size}, stop_loss={self.stop_loss_points}, "
-            f"take_profit_mult={tp_mult}, limit_offset={self.params.get('limit_offset', self.limit_offset)}, "
+            f"take_profit_mult={tp_mult}, limit_offset={self._cfg.off}, "
             f"use_delayed={use_delayed}, avg_cost_is_price={avg_cost_is_price}")
 
         try:
@@ -95,9 +134,7 @@ class FuturesMNQStrategy(Strategy):
             if size != 0:
                 entry = self._convert_avg_cost_to_price(avg_cost, default_mult=getattr(self._contract, "multiplier", "2"),
                                                         enabled=avg_cost_is_price)
-                self._in_trade = True
-                self._entry_price = entry
-                self._entry_time = datetime.now()
+                self._set_entry(entry)
                 self._record_price("adopted", log)
                 side = "LONG" if size > 0 else "SHORT"
                 log(f"🤝 Adopted existing position → side={side}, size={size}, entry_price≈{entry}")
@@ -112,28 +149,33 @@ class FuturesMNQStrategy(Strategy):
                 else:
                     log("✅ Position opened")
 
-            # 6) Monitor loop
+            # 6) Monitor loop: wake on ticker updates (and the demo-close timer) instead of polling
             log("⏱️  Monitoring position...")
-            started = datetime.now()
-            while self._running and (datetime.now() - started).seconds < max_runtime_sec:
-                self._record_price("monitor", log)
-
-                if await self._check_stop_loss(acct, log):
-                    log("🛑 Closed by stop loss.")
-                    break
-                if await self._check_take_profit(acct, tp_mult, log):
-                    log("🎯 Closed by take profit.")
-                    break
-
-                if self._in_trade and self._entry_time:
-                    dur = (datetime.now() - self._entry_time).seconds
-                    if dur >= demo_close_after:
-                        log(f"⏰ Demo: time-based close after {dur}s")
-                        await self._close_position_limit(acct, log)
-                        break
-
-                # IMPORTANT: use asyncio.sleep (not IB.sleep) to avoid nested loop errors
-                await asyncio.sleep(1.0)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + max_runtime_sec
+            tick = self._tick_event = asyncio.Event()
+            tick.set()  # evaluate once straight away
+            close_due = asyncio.Event()
+
+            def on_update(*_):
+                tick.set()
+
+            def on_close_due():
+                close_due.set()
+                tick.set()
+
+            self._ticker_stream.updateEvent += on_update
+            close_timer = None
+            if self._in_trade and self._entry_time:
+                elapsed = time.monotonic() - self._entry_time
+                close_timer = loop.call_later(max(demo_close_after - elapsed, 0.0), on_close_due)
+            try:
+                await self._monitor(acct, tick, close_due, deadline, log)
+            finally:
+                self._ticker_stream.updateEvent -= on_update
+                self._tick_event = None
+                if close_timer:
+                    close_timer.cancel()
 
             log("✅ Monitoring complete.")
             return True
@@ -145,8 +187,49 @@ class FuturesMNQStrategy(Strategy):
         finally:
             await self._cleanup(log)
 
+    async def _monitor(self, acct: Optional[str], tick: asyncio.Event,
+                       close_due: asyncio.Event, deadline: float, log):
+        loop = asyncio.get_running_loop()
+        while self._running:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(tick.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            tick.clear()
+            if not self._running:
+                break
+
+            self._record_price("monitor", log)
+
+            t = self._ticker_stream
+            bid, ask = t.bid, t.ask
+            if self._in_trade and bid is not None and ask is not None and t.bidSize and t.askSize:
+                hit = self._evaluate_exits(bid, ask)
+                if hit == "SL":
+                    log(f"🛑 Stop loss hit: side=LONG, entry={self._entry_price}, bid={bid}, ask={ask}, "
+                        f"stop_level={self._stop_px}")
+                    await self._close_position_limit(acct, log)
+                    log("🛑 Closed by stop loss.")
+                    break
+                if hit == "TP":
+                    log(f"🎯 Take-profit hit: ask={ask} >= target={self._tp_px}")
+                    await self._close_position_limit(acct, log)
+                    log("🎯 Closed by take profit.")
+                    break
+
+            if self._in_trade and self._entry_time and close_due.is_set():
+                dur = int(time.monotonic() - self._entry_time)
+                log(f"⏰ Demo: time-based close after {dur}s")
+                await self._close_position_limit(acct, log)
+                break
+
     def stop(self):
         self._running = False
+        if self._tick_event:
+            self._tick_event.set()
         try:
             if self._ticker_stream:
                 # cancel by Ticker if possible; ignore errors if already gone
@@ -177,19 +260,26 @@ class FuturesMNQStrategy(Strategy):
             attempts.append(Future(localSymbol=ls, exchange="CME",    currency="USD"))
 
         for idx, c in enumerate(attempts, 1):
-            try:
-                log(f"🔎 Qualify attempt {idx}: symbol={getattr(c,'symbol',None)}, "
-                    f"expiry={getattr(c,'lastTradeDateOrContractMonth',None)}, exchange={c.exchange!r}, "
-                    f"tradingClass={getattr(c,'tradingClass',None)}, localSymbol={getattr(c,'localSymbol',None)}")
-                q = await self.ib.qualifyContractsAsync(c)
-                if q:
-                    log(f"✅ Qualified on attempt {idx} → conId={q[0].conId}, exchange={q[0].exchange}, "
-                        f"tradingClass={getattr(q[0],'tradingClass',None)}, localSymbol={getattr(q[0],'localSymbol',None)}")
-                    return q[0]
-                else:
-                    log(f"⚠️ Attempt {idx} returned no results.")
-            except Exception as e:
-                log(f"❌ Attempt {idx} failed: {e}")
+            log(f"🔎 Qualify attempt {idx}: symbol={getattr(c,'symbol',None)}, "
+                f"expiry={getattr(c,'lastTradeDateOrContractMonth',None)}, exchange={c.exchange!r}, "
+                f"tradingClass={getattr(c,'tradingClass',None)}, localSymbol={getattr(c,'localSymbol',None)}")
+
+        # Fire all attempts at once; startup waits for one round trip instead of up to seven
+        results = await asyncio.gather(
+            *(self.ib.qualifyContractsAsync(c) for c in attempts),
+            return_exceptions=True,
+        )
+
+        # Keep the original preference order: the earliest successful attempt wins
+        for idx, q in enumerate(results, 1):
+            if isinstance(q, Exception):
+                log(f"❌ Attempt {idx} failed: {q}")
+            elif q:
+                log(f"✅ Qualified on attempt {idx} → conId={q[0].conId}, exchange={q[0].exchange}, "
+                    f"tradingClass={getattr(q[0],'tradingClass',None)}, localSymbol={getattr(q[0],'localSymbol',None)}")
+                return q[0]
+            else:
+                log(f"⚠️ Attempt {idx} returned no results.")
         return None
 
     def _mnq_local_symbol_from_expiry(self, symbol: str, yyyymm: str) -> Optional[str]:
@@ -197,11 +287,9 @@ class FuturesMNQStrategy(Strategy):
             return None
         y = int(yyyymm[:4])
         m = int(yyyymm[4:6])
-        codes = {1:"F",2:"G",3:"H",4:"J",5:"K",6:"M",7:"N",8:"Q",9:"U",10:"V",11:"X",12:"Z"}
-        mc = codes.get(m)
-        if not mc:
+        if not 1 <= m <= 12:
             return None
-        return f"{symbol}{mc}{str(y)[-1]}"
+        return f"{symbol}{_MONTH_CODES[m - 1]}{y % 10}"
 
     # ------------------------------ Market Data ------------------------------
 
@@ -215,6 +303,10 @@ class FuturesMNQStrategy(Strategy):
         except Exception as e:
             log(f"⚠️ could not load minTick, using default {self._tick_size}: {e}")
 
+        # The tick is fixed for the session: bind a rounder specialised to it
+        step = self._tick_size or 0.25
+        self._round_to_tick = lambda px, s=step: round(round(px / s) * s, 10)
+
     async def _setup_market_data(self, log, use_delayed: bool) -> bool:
         try:
             try:
@@ -232,33 +324,39 @@ class FuturesMNQStrategy(Strategy):
 
             self._ticker_stream = self.ib.reqMktData(self._contract, "", False, False)
 
-            # Wait up to 5s for NBBO
-            deadline = datetime.now().timestamp() + 5.0
-            while datetime.now().timestamp() < deadline:
-                await self.ib.reqTickersAsync(self._contract)
-                self._record_price("first_ticks", log)
-                if self._has_nbbo(self._ticker_stream):
-                    log(f"✅ NBBO: bid={self._ticker_stream.bid} x {getattr(self._ticker_stream,'bidSize',0)}, "
-                        f"ask={self._ticker_stream.ask} x {getattr(self._ticker_stream,'askSize',0)}, "
-                        f"last={self._ticker_stream.last}")
-                    return True
-                # IMPORTANT: use asyncio.sleep here
-                await asyncio.sleep(0.2)
-
-            log("❌ NBBO not available within timeout (no trading).")
-            return False
+            # Wait up to 5s for NBBO, woken by the ticker's own updates
+            t = self._ticker_stream
+            got_nbbo = asyncio.Event()
+
+            def on_update(*_):
+                if self._has_nbbo(t):
+                    got_nbbo.set()
+
+            on_update()
+            t.updateEvent += on_update
+            try:
+                await asyncio.wait_for(got_nbbo.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
+                log("❌ NBBO not available within timeout (no trading).")
+                return False
+            finally:
+                t.updateEvent -= on_update
+
+            self._record_price("first_ticks", log)
+            log(f"✅ NBBO: bid={t.bid} x {getattr(t,'bidSize',0)}, "
+                f"ask={t.ask} x {getattr(t,'askSize',0)}, "
+                f"last={t.last}")
+            return True
 
         except Exception as e:
             log(f"❌ _setup_market_data failed: {e}")
             return False
 
     def _has_nbbo(self, t) -> bool:
-        return (
-            getattr(t, "bid", None) is not None and
-            getattr(t, "ask", None) is not None and
-            getattr(t, "bidSize", 0) and
-            getattr(t, "askSize", 0)
-        )
+        # Ticker fields always exist (None/NaN until populated), so read them directly
+        if t is None:
+            return False
+        return t.bid is not None and t.ask is not None and bool(t.bidSize) and bool(t.askSize)
 
     def _round_to_tick(self, px: float) -> float:
         step = float(getattr(self, "_tick_size", 0.25) or 0.25)
@@ -272,17 +370,32 @@ class FuturesMNQStrategy(Strategy):
         t = self._ticker_stream
         if not t:
             return
-        snap = {
-            "ts": datetime.now().strftime("%H:%M:%S.%f")[:-3],
-            "label": label,
-            "bid": getattr(t, "bid", None),
-            "ask": getattr(t, "ask", None),
-            "last": getattr(t, "last", None),
-            "bidSize": getattr(t, "bidSize", None),
-            "askSize": getattr(t, "askSize", None),
-            "lastSize": getattr(t, "lastSize", None),
-        }
-        self._snapshots.append(snap)
+        # Routine monitor snapshots are only kept when the quote moved, at most once
+        # per _SNAP_MONITOR_INTERVAL; labelled transitions (entry/exit etc.) are
+        # always recorded
+        bid, ask, last = t.bid, t.ask, t.last
+        key = (bid, ask, last)
+        if label == "monitor":
+            if key == self._last_recorded:
+                return
+            mono = time.monotonic()
+            if mono - self._last_monitor_snap < _SNAP_MONITOR_INTERVAL:
+                return
+            self._last_monitor_snap = mono
+        self._last_recorded = key
+        i = self._snap_n
+        if i == _SNAP_CAPACITY:
+            keep = _SNAP_CAPACITY // 2
+            for col in (self._snap_ts, self._snap_label, self._snap_px, self._snap_sz):
+                col[:keep] = col[i - keep:i]
+            self._snap_dropped += i - keep
+            i = keep
+        now = time.time()
+        self._snap_ts[i] = f"{time.strftime('%H:%M:%S', time.localtime(now))}.{int(now % 1 * 1000):03d}"
+        self._snap_label[i] = label
+        self._snap_px[i] = (_num(bid), _num(ask), _num(last))
+        self._snap_sz[i] = (_num(t.bidSize), _num(t.askSize), _num(t.lastSize))
+        self._snap_n = i + 1
 
     # ------------------------------ Positions & Orders ------------------------------
 
@@ -291,19 +404,19 @@ class FuturesMNQStrategy(Strategy):
         Returns (netSize, avgCost) for the target conId/account; 0,0 if none.
         """
         try:
-            positions = await self.ib.reqPositionsAsync()
+            # ib_async keeps positions current after connect; read the local cache (no round trip)
+            positions = self.ib.positions(acct) if acct else self.ib.positions()
             conid = getattr(self._contract, "conId", None)
             net = 0
             avg_cost = 0.0
             for p in positions:
-                if getattr(p.contract, "conId", None) == conid:
-                    if not acct or p.account == acct:
-                        net += int(p.position)
-                        avg_cost = float(p.avgCost or 0.0)
+                if p.contract.conId == conid:
+                    net += int(p.position)
+                    avg_cost = float(p.avgCost or 0.0)
             log(f"ℹ️ Existing position detected: size={net}, avgCost={avg_cost}")
             return net, avg_cost
         except Exception as e:
-            log(f"⚠️ reqPositionsAsync error: {e}")
+            log(f"⚠️ positions lookup error: {e}")
             return 0, 0.0
 
     def _convert_avg_cost_to_price(self, avg_cost: float, default_mult: Optional[str], enabled: bool) -> float:
@@ -331,8 +444,8 @@ class FuturesMNQStrategy(Strategy):
             return False
 
         ask, bid = self._nbbo()
-        off = float(self.params.get("limit_offset", self.limit_offset))
-        tif = str(self.params.get("tif", "DAY")).upper()
+        cfg = self._cfg
+        off, tif = cfg.off, cfg.tif
         px = self._round_to_tick(ask + off)
 
         self._record_price("pre_entry", log)
@@ -340,13 +453,13 @@ class FuturesMNQStrategy(Strategy):
 
         order = LimitOrder(
             action="BUY",
-            totalQuantity=int(self.contract_size),
+            totalQuantity=cfg.qty,
             lmtPrice=px,
             tif=tif,
             account=acct or None,
         )
         trade = self.ib.placeOrder(self._contract, order)
-        ok = await self._wait_for_fill(trade, log, timeout=int(self.params.get("limit_timeout", 30)))
+        ok = await self._wait_for_fill(trade, log, timeout=cfg.limit_timeout)
         if not ok:
             try:
                 self.ib.cancelOrder(trade.order)
@@ -355,9 +468,7 @@ class FuturesMNQStrategy(Strategy):
                 log(f"cancel error: {e}")
             return False
 
-        self._in_trade = True
-        self._entry_price = float(trade.orderStatus.avgFillPrice or px)
-        self._entry_time = datetime.now()
+        self._set_entry(float(trade.orderStatus.avgFillPrice or px))
         self._record_price("post_entry_fill", log)
         log(f"✅ BUY filled @ {self._entry_price}")
         return True
@@ -373,8 +484,8 @@ class FuturesMNQStrategy(Strategy):
             return False
 
         ask, bid = self._nbbo()
-        off = float(self.params.get("limit_offset", self.limit_offset))
-        tif = str(self.params.get("tif", "DAY")).upper()
+        cfg = self._cfg
+        off, tif = cfg.off, cfg.tif
         px = self._round_to_tick(bid - off)
 
         self._record_price("pre_exit", log)
@@ -382,13 +493,13 @@ class FuturesMNQStrategy(Strategy):
 
         order = LimitOrder(
             action="SELL",
-            totalQuantity=int(self.contract_size),
+            totalQuantity=cfg.qty,
             lmtPrice=px,
             tif=tif,
             account=acct or None,
         )
         trade = self.ib.placeOrder(self._contract, order)
-        ok = await self._wait_for_close_fill(trade, log, timeout=int(self.params.get("limit_timeout", 30)))
+        ok = await self._wait_for_close_fill(trade, log, timeout=cfg.limit_timeout)
         if not ok:
             log("⚠️ Exit not filled within timeout")
             return False
@@ -397,71 +508,70 @@ class FuturesMNQStrategy(Strategy):
         self._record_price("post_exit_fill", log)
 
         if self._entry_price is not None:
-            pnl = (close_px - self._entry_price) * int(self.contract_size) * 2.0  # MNQ $2/pt
+            pnl = (close_px - self._entry_price) * cfg.qty * 2.0  # MNQ $2/pt
             log(f"📈 P&L: ${pnl:.2f} (entry {self._entry_price} → exit {close_px})")
 
         self._in_trade = False
         self._entry_price = None
         self._entry_time = None
+        self._stop_px = self._tp_px = None
         log("✅ Position closed.")
         return True
 
+    async def _await_done(self, trade, timeout) -> str:
+        """Wait (≤timeout) for the trade to reach a terminal state; returns its status."""
+        # statusEvent fires on every status change; stop at the first terminal one
+        # (Filled/Cancelled/ApiCancelled) — no polling needed
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not trade.isDone():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(trade.statusEvent, timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+        return getattr(trade.orderStatus, "status", "")
+
     async def _wait_for_fill(self, trade, log, timeout=30) -> bool:
-        start = datetime.now()
         log(f"⏳ Waiting fill (≤{timeout}s)...")
-        while (datetime.now() - start).seconds < timeout:
-            # IMPORTANT: asyncio.sleep, not IB.sleep
-            await asyncio.sleep(0.4)
-            status = getattr(trade.orderStatus, "status", "")
-            if status == "Filled":
-                return True
-            if status in ("Cancelled", "ApiCancelled", "Error"):
-                log(f"❌ Order failed: status={status} err={getattr(trade.orderStatus, 'errorMessage', '')}")
-                return False
+        status = await self._await_done(trade, timeout)
+        if status == "Filled":
+            return True
+        if status in ("Cancelled", "ApiCancelled", "Error"):
+            log(f"❌ Order failed: status={status} err={getattr(trade.orderStatus, 'errorMessage', '')}")
         return False
 
     async def _wait_for_close_fill(self, trade, log, timeout=30) -> bool:
-        start = datetime.now()
         log(f"⏳ Waiting close fill (≤{timeout}s)...")
-        while (datetime.now() - start).seconds < timeout:
-            await asyncio.sleep(0.4)  # IMPORTANT
-            status = getattr(trade.orderStatus, "status", "")
-            if status == "Filled":
-                log(f"✅ Close filled @ {trade.orderStatus.avgFillPrice}")
-                return True
-            if status in ("Cancelled", "ApiCancelled", "Error"):
-                log(f"❌ Close failed: status={status} err={getattr(trade.orderStatus, 'errorMessage', '')}")
-                return False
-        return False
-
-    async def _check_stop_loss(self, acct: Optional[str], log) -> bool:
-        if not (self._in_trade and self._entry_price):
-            return False
-        t = self._ticker_stream
-        if not self._has_nbbo(t):
-            return False
-        ask, bid = self._nbbo()
-        stop = float(self._entry_price) - float(self.stop_loss_points)
-        # Long-only logic; if you add shorts, flip logic appropriately.
-        if bid <= stop:
-            log(f"🛑 Stop loss hit: side=LONG, entry={self._entry_price}, bid={bid}, ask={ask}, stop_level={stop}")
-            await self._close_position_limit(acct, log)
+        status = await self._await_done(trade, timeout)
+        if status == "Filled":
+            log(f"✅ Close filled @ {trade.orderStatus.avgFillPrice}")
             return True
+        if status in ("Cancelled", "ApiCancelled", "Error"):
+            log(f"❌ Close failed: status={status} err={getattr(trade.orderStatus, 'errorMessage', '')}")
         return False
 
-    async def _check_take_profit(self, acct: Optional[str], tp_mult: float, log) -> bool:
-        if not (self._in_trade and self._entry_price):
-            return False
-        t = self._ticker_stream
-        if not self._has_nbbo(t):
-            return False
-        ask, bid = self._nbbo()
-        target = float(self._entry_price) + float(self.stop_loss_points) * float(tp_mult)
-        if ask >= target:
-            log(f"🎯 Take-profit hit: ask={ask} >= target={target}")
-            await self._close_position_limit(acct, log)
-            return True
-        return False
+    def _set_entry(self, price: float):
+        self._in_trade = True
+        self._entry_price = price
+        self._entry_time = time.monotonic()
+        if price:
+            cfg = self._cfg
+            self._stop_px = price - cfg.stop_loss
+            self._tp_px = price + cfg.stop_loss * cfg.tp_mult
+        else:
+            self._stop_px = self._tp_px = None
+
+    def _evaluate_exits(self, bid: float, ask: float) -> Optional[str]:
+        """Which exit (if any) the quote triggers: "SL", "TP" or None. Long-only."""
+        # Levels are None until an entry price is known; if you add shorts, flip logic appropriately.
+        if self._stop_px is not None and bid <= self._stop_px:
+            return "SL"
+        if self._tp_px is not None and ask >= self._tp_px:
+            return "TP"
+        return None
  
     # ------------------------------ Cleanup & Summary ------------------------------
 
@@ -486,18 +596,28 @@ class FuturesMNQStrategy(Strategy):
             log(f"⚠️ Cleanup error: {e}")
 
     def _print_price_summary(self, log):
-        if not self._snapshots:
+        n = self._snap_n
+        if not n:
             log("ℹ️ No price snapshots recorded.")
             return
-        log("\n===== PRICE SNAPSHOTS (chronological) =====")
         header = f"{'time':>12}  {'label':>12}  {'bid':>10}  {'ask':>10}  {'last':>10}  {'bidSz':>6}  {'askSz':>6}"
-        log(header)
-        log("-" * len(header))
-        for s in self._snapshots:
-            def num(x):
-                return f"{x:.2f}" if isinstance(x, (int, float)) else "-"
-            log(f"{s['ts']:>12}  {s['label']:>12}  "
-                f"{num(s['bid']):>10}  {num(s['ask']):>10}  {num(s['last']):>10}  "
-                f"{(str(s['bidSize']) if s['bidSize'] is not None else '-'):>6}  "
-                f"{(str(s['askSize']) if s['askSize'] is not None else '-'):>6}")
-        log("===========================================\n")
+        lines = ["\n===== PRICE SNAPSHOTS (chronological) =====", header, "-" * len(header)]
+        if self._snap_dropped:
+            lines.append(f"({self._snap_dropped} older snapshots dropped)")
+
+        def num(x):
+            return "-" if math.isnan(x) else f"{x:.2f}"
+
+        def size(x):
+            return "-" if math.isnan(x) else f"{x:g}"
+
+        lines.extend(
+            f"{ts:>12}  {label:>12}  "
+            f"{num(bid):>10}  {num(ask):>10}  {num(last):>10}  "
+            f"{size(bid_sz):>6}  {size(ask_sz):>6}"
+            for ts, label, (bid, ask, last), (bid_sz, ask_sz, _) in zip(
+                self._snap_ts[:n], self._snap_label[:n], self._snap_px[:n].tolist(), self._snap_sz[:n].tolist())
+        )
+        lines.append("===========================================\n")
+        # One log call for the whole table rather than one per row
+        log("\n".join(lines))
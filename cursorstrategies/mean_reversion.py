@@ -8,8 +8,17 @@ from ib_async import IB, Stock, MarketOrder, util
 from ib_async.objects import BarData
 from datetime import datetime, timezone, timedelta
 import asyncio
+import os
+import time
+import itertools
+import math
 import numpy as np
 
+from cursorstrategies._bars import HistoricalBarsCache
+
+# 1 = normal, 2 = also log per-bar indicator values
+LOG_LEVEL = int(os.environ.get("STRAT_LOG_LEVEL", "1"))
+
 class MeanReversionStrategy(Strategy):
     """
     Mean Reversion Strategy
@@ -19,6 +28,15 @@ class MeanReversionStrategy(Strategy):
     
     name = "MeanReversion"
     
+    def __init__(self):
+        super().__init__()
+        # Set by stop() to end the run early
+        self._stop_event = asyncio.Event()
+    
+    def stop(self):
+        """Ask a running strategy to close out and return"""
+        self._stop_event.set()
+    
     async def run(self, ib, params, log):
         """
         Main strategy execution method called by the strategy runner
@@ -52,13 +70,18 @@ class MeanReversionStrategy(Strategy):
             strategy = MeanReversion(
                 ib, ticker, account, ma_period, deviation_threshold
             )
+            await strategy.setup()
             
-            # Run for a limited time (e.g., 1 hour) to demonstrate
+            # Run for a limited time (e.g., 1 hour) to demonstrate, or until stop() is called
             log(f"Strategy started, running for 1 hour...")
-            await asyncio.sleep(3600)  # Run for 1 hour
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=3600)
+                log("Stop requested")
+            except asyncio.TimeoutError:
+                pass
             
             # Stop the strategy
-            strategy.stop()
+            await strategy.stop()
             log(f"{self.name} strategy completed successfully!")
             return True
             
@@ -83,58 +106,121 @@ class MeanReversion:
         self.position = 0
         self.entry_price = None
         self.entry_time = None
+        self.bars = None
+        # Order placed from a bar update that hasn't completed yet
+        self._order_task = None
+        
+        # Rolling window over the closes of the last ma_period - 1 completed bars;
+        # the still-forming bar is added at signal time. Running sums make the
+        # mean/std O(1) per bar instead of rebuilding the close list.
+        self._ring = np.empty(max(self.ma_period - 1, 0), dtype=np.float64)
+        self._ring_i = 0
+        self._ring_filled = self._ring.size == 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        # (bar count, last bar date) of the last evaluation; IB can replay a bar
+        self._last_eval_key = None
         
-        if not self.ib.isConnected():
-            print("⚠️ IB is not connected. Connect before constructing the strategy.")
-            
         # Underlying stock
         self.underlying = Stock(self.ticker, 'SMART', 'USD')
-        self.ib.qualifyContracts(self.underlying)
-        
-        # Historical bars for calculating moving averages and volatility
-        self.bars = self.ib.reqHistoricalData(
-            self.underlying,
-            endDateTime='',
-            durationStr='60 D',
-            barSizeSetting='1 day',
-            whatToShow='TRADES',
-            useRTH=True,
-            keepUpToDate=True,
-            formatDate=1
-        )
+    
+    async def setup(self):
+        """Qualify the contract and subscribe to bars (must run inside the event loop)"""
+        if not self.ib.isConnected():
+            print("⚠️ IB is not connected. Connect before setting up the strategy.")
+            
+        await self.ib.qualifyContractsAsync(self.underlying)
+        
+        # Historical bars for calculating moving averages and volatility (shared per ticker/window)
+        self.bars = await HistoricalBarsCache.acquire(self.ib, self.underlying, '60 D', '1 day')
+        
+        self._seed_window()
         
         # Set up bar update handler
         self.bars.updateEvent += self.on_bar_update
         
-        log(f"Mean Reversion strategy initialized for {ticker}")
-        log(f"MA Period: {ma_period}, Deviation Threshold: {deviation_threshold}")
+        log(f"Mean Reversion strategy initialized for {self.ticker}")
+        log(f"MA Period: {self.ma_period}, Deviation Threshold: {self.deviation_threshold}")
+    
+    def _seed_window(self):
+        """Fill the rolling window from the history's most recent completed bars"""
+        size = self._ring.size
+        total = len(self.bars)
+        k = min(total - 1, size)
+        if k <= 0:
+            return
+        closes = itertools.islice(self.bars, total - 1 - k, total - 1)
+        window = self._ring[:k]
+        window[:] = np.fromiter((b.close for b in closes), np.float64, k)
+        self._sum = float(window.sum())
+        self._sumsq = float(np.dot(window, window))
+        self._ring_i = k % size
+        self._ring_filled = k == size
+    
+    def _push_close(self, close: float):
+        """Add a completed bar's close to the rolling window"""
+        size = self._ring.size
+        if size == 0:
+            return
+        i = self._ring_i
+        if self._ring_filled:
+            old = float(self._ring[i])
+            self._sum -= old
+            self._sumsq -= old * old
+        self._ring[i] = close
+        self._sum += close
+        self._sumsq += close * close
+        
+        i += 1
+        if i == size:
+            i = 0
+            self._ring_filled = True
+            # Re-anchor the running sums once per wrap so rounding error can't build up
+            self._sum = float(self._ring.sum())
+            self._sumsq = float(np.dot(self._ring, self._ring))
+        self._ring_i = i
     
     def on_bar_update(self, bars, has_new_bar):
         """Handle new bar updates"""
-        if has_new_bar and len(bars) >= self.ma_period:
-            self.check_signals()
+        if has_new_bar:
+            # The previous bar is now complete
+            if len(bars) >= 2:
+                self._push_close(bars[-2].close)
+            if self._ring_filled:
+                self.check_signals()
     
     def check_signals(self):
         """Check for mean reversion signals"""
-        if len(self.bars) < self.ma_period:
+        if not self._ring_filled or not self.bars:
+            return
+        if self._order_task and not self._order_task.done():
+            # Still waiting on the last order
+            return
+        
+        # Skip bars that were already evaluated
+        key = (len(self.bars), getattr(self.bars[-1], 'date', None))
+        if key == self._last_eval_key:
             return
+        self._last_eval_key = key
             
         # Calculate moving average and standard deviation
-        closes = [bar.close for bar in self.bars]
-        current_price = closes[-1]
-        ma = np.mean(closes[-self.ma_period:])
-        std = np.std(closes[-self.ma_period:])
+        current_price = self.bars[-1].close
+        n = self._ring.size + 1
+        ma = (self._sum + current_price) / n
+        var = (self._sumsq + current_price * current_price) / n - ma * ma
+        std = math.sqrt(max(var, 0.0))
         
         # Calculate z-score (how many standard deviations from mean)
         z_score = (current_price - ma) / std if std > 0 else 0
         
-        log(f"Current Price: ${current_price:.2f}, MA: ${ma:.2f}, Z-Score: {z_score:.2f}")
+        if LOG_LEVEL >= 2:
+            log(f"Current Price: ${current_price:.2f}, MA: ${ma:.2f}, Z-Score: {z_score:.2f}")
         
         # Check for entry signals
         if not self.in_trade:
             if z_score < -self.deviation_threshold:
                 # Price significantly below mean - buy signal
-                self.buy()
+                self._order_task = asyncio.ensure_future(self.buy())
             elif z_score > self.deviation_threshold:
                 # Price significantly above mean - short signal (if supported)
                 log(f"Short signal detected (Z-Score: {z_score:.2f}) but shorting not implemented")
@@ -143,18 +229,33 @@ class MeanReversion:
         elif self.in_trade:
             # Exit when price returns to mean (z-score approaches 0)
             if abs(z_score) < 0.5:  # Close to mean
-                self.sell()
+                self._order_task = asyncio.ensure_future(self.sell())
             # Stop loss if price moves further away
             elif z_score < -self.deviation_threshold * 1.5:
                 log(f"Stop loss triggered (Z-Score: {z_score:.2f})")
-                self.sell()
+                self._order_task = asyncio.ensure_future(self.sell())
+    
+    async def _wait_filled(self, trade, timeout: float = 5.0):
+        """Wait until the order is filled, cancelled or rejected (or the timeout passes)"""
+        # statusEvent fires on every status change (Submitted, Filled, Cancelled, ...);
+        # stop at the first terminal one, so a rejected order returns at once
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not trade.isDone():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(trade.statusEvent, timeout=remaining)
+            except asyncio.TimeoutError:
+                return
     
-    def buy(self):
+    async def buy(self):
         """Execute buy order"""
         try:
             order = MarketOrder('BUY', 100)  # Buy 100 shares
             trade = self.ib.placeOrder(self.underlying, order)
-            self.ib.sleep(1)  # Wait for order to be processed
+            await self._wait_filled(trade)
             
             if trade.orderStatus.status == 'Filled':
                 self.in_trade = True
@@ -168,12 +269,12 @@ class MeanReversion:
         except Exception as e:
             log(f"Error executing buy order: {e}")
     
-    def sell(self):
+    async def sell(self):
         """Execute sell order"""
         try:
             order = MarketOrder('SELL', self.position)
             trade = self.ib.placeOrder(self.underlying, order)
-            self.ib.sleep(1)  # Wait for order to be processed
+            await self._wait_filled(trade)
             
             if trade.orderStatus.status == 'Filled':
                 exit_price = trade.orderStatus.avgFillPrice
@@ -193,15 +294,19 @@ class MeanReversion:
         except Exception as e:
             log(f"Error executing sell order: {e}")
     
-    def stop(self):
+    async def stop(self):
         """Stop the strategy and close any open positions"""
+        if self._order_task and not self._order_task.done():
+            await self._order_task
         if self.in_trade:
             log("Closing open position before stopping...")
-            self.sell()
+            await self.sell()
         
         # Disconnect from bar updates
         if hasattr(self, 'bars') and self.bars:
             self.bars.updateEvent -= self.on_bar_update
+            HistoricalBarsCache.release(self.ib, self.bars)
+            self.bars = None
         
         log("Mean Reversion strategy stopped")
 
@@ -209,5 +314,5 @@ class MeanReversion:
 # Helper function for logging
 def log(message):
     """Simple logging function"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
@@ -8,8 +8,17 @@ from ib_async import IB, Stock, MarketOrder, util
 from ib_async.objects import BarData
 from datetime import datetime, timezone, timedelta
 import asyncio
+import os
+import time
+import math
 import numpy as np
 
+from cursorstrategies import _indicators
+from cursorstrategies._bars import CloseBuffer, HistoricalBarsCache
+
+# 1 = normal, 2 = also log per-bar indicator values
+LOG_LEVEL = int(os.environ.get("STRAT_LOG_LEVEL", "1"))
+
 class MomentumStrategy(Strategy):
     """
     Momentum Strategy
@@ -19,6 +28,15 @@ class MomentumStrategy(Strategy):
     
     name = "Momentum"
     
+    def __init__(self):
+        super().__init__()
+        # Set by stop() to end the run early
+        self._stop_event = asyncio.Event()
+    
+    def stop(self):
+        """Ask a running strategy to close out and return"""
+        self._stop_event.set()
+    
     async def run(self, ib, params, log):
         """
         Main strategy execution method called by the strategy runner
@@ -55,13 +73,18 @@ class MomentumStrategy(Strategy):
                 ib, ticker, account, rsi_period, rsi_overbought, 
                 rsi_oversold, momentum_period
             )
+            await strategy.setup()
             
-            # Run for a limited time (e.g., 1 hour) to demonstrate
+            # Run for a limited time (e.g., 1 hour) to demonstrate, or until stop() is called
             log(f"Strategy started, running for 1 hour...")
-            await asyncio.sleep(3600)  # Run for 1 hour
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=3600)
+                log("Stop requested")
+            except asyncio.TimeoutError:
+                pass
             
             # Stop the strategy
-            strategy.stop()
+            await strategy.stop()
             log(f"{self.name} strategy completed successfully!")
             return True
             
@@ -70,6 +93,11 @@ class MomentumStrategy(Strategy):
             return False
 
 
+# Signal action by (in_trade << 2) | (long entry << 1) | (short signal when flat, exit signal in trade).
+# When flat a long entry wins over a short signal; in a trade only the exit bit matters.
+_SIGNAL_ACTIONS = (None, "short", "buy", "buy", None, "sell", None, "sell")
+
+
 class Momentum:
     """
     Momentum Strategy Implementation
@@ -85,106 +113,158 @@ class Momentum:
         self.rsi_overbought = rsi_overbought
         self.rsi_oversold = rsi_oversold
         self.momentum_period = momentum_period
+        # Bars needed before signals are evaluated
+        self._warmup = max(rsi_period, momentum_period)
         self.in_trade = False
         self.position = 0
         self.entry_price = None
         self.entry_time = None
+        self.bars = None
+        # Order placed from a bar update that hasn't completed yet
+        self._order_task = None
         
-        if not self.ib.isConnected():
-            print("⚠️ IB is not connected. Connect before constructing the strategy.")
-            
         # Underlying stock
         self.underlying = Stock(self.ticker, 'SMART', 'USD')
-        self.ib.qualifyContracts(self.underlying)
-        
-        # Historical bars for calculating indicators
-        self.bars = self.ib.reqHistoricalData(
-            self.underlying,
-            endDateTime='',
-            durationStr='30 D',
-            barSizeSetting='1 day',
-            whatToShow='TRADES',
-            useRTH=True,
-            keepUpToDate=True,
-            formatDate=1
-        )
+    
+    async def setup(self):
+        """Qualify the contract and subscribe to bars (must run inside the event loop)"""
+        if not self.ib.isConnected():
+            print("⚠️ IB is not connected. Connect before setting up the strategy.")
+            
+        await self.ib.qualifyContractsAsync(self.underlying)
+        
+        # Historical bars for calculating indicators (shared with other strategies on this ticker)
+        self.bars = await HistoricalBarsCache.acquire(self.ib, self.underlying, '30 D', '1 day')
+        
+        # Close series, updated per bar; the indicators only need the recent closes
+        self._closes = CloseBuffer(self.bars, keep=max(self.rsi_period + 1, self.momentum_period))
+        
+        # Wilder-smoothed average gain/loss over completed bars, advanced once per bar
+        self._avg_gain = None
+        self._avg_loss = None
+        self._seed_rsi(len(self._closes) - 1)
+        
+        # With numba the first kernel call compiles (or loads the on-disk cache);
+        # pay that here rather than inside the first bar callback
+        _indicators.wilder_averages(self._closes.values, self.rsi_period)
+        _indicators.momentum_pct(self._closes.values, self.momentum_period)
         
         # Set up bar update handler
         self.bars.updateEvent += self.on_bar_update
         
-        log(f"Momentum strategy initialized for {ticker}")
-        log(f"RSI Period: {rsi_period}, Momentum Period: {momentum_period}")
+        log(f"Momentum strategy initialized for {self.ticker}")
+        log(f"RSI Period: {self.rsi_period}, Momentum Period: {self.momentum_period}")
+    
+    def _seed_rsi(self, count: int):
+        """Seed the RSI averages from the first `count` buffered (completed) closes"""
+        if count < self.rsi_period + 1:
+            return
+        avg_gain, avg_loss = _indicators.wilder_averages(self._closes.values[:count], self.rsi_period)
+        self._avg_gain, self._avg_loss = float(avg_gain), float(avg_loss)
+    
+    def _wilder_step(self, avg_gain: float, avg_loss: float, delta: float):
+        p = self.rsi_period
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        return (avg_gain * (p - 1) + gain) / p, (avg_loss * (p - 1) + loss) / p
     
     def on_bar_update(self, bars, has_new_bar):
         """Handle new bar updates"""
-        if has_new_bar and len(bars) >= max(self.rsi_period, self.momentum_period):
-            self.check_signals()
+        if has_new_bar:
+            # The previous bar is now complete; take its final close, then add the new one
+            closes = self._closes
+            n = len(closes)
+            if n and len(bars) >= 2:
+                closes.complete_last(bars[-2].close)
+                if self._avg_gain is None:
+                    self._seed_rsi(n)
+                elif n >= 2:
+                    self._avg_gain, self._avg_loss = self._wilder_step(
+                        self._avg_gain, self._avg_loss, closes[-1] - closes[-2])
+            closes.append(bars[-1].close)
+            if len(bars) >= self._warmup:
+                self.check_signals()
     
-    def calculate_rsi(self, prices, period=14):
-        """Calculate RSI indicator"""
-        if len(prices) < period + 1:
+    def calculate_rsi(self):
+        """Wilder RSI including the forming bar (O(1): one provisional smoothing step)"""
+        c = self._closes
+        if self._avg_gain is not None and len(c) >= 2:
+            avg_gain, avg_loss = self._wilder_step(self._avg_gain, self._avg_loss, c[-1] - c[-2])
+        elif len(c) >= self.rsi_period + 1:
+            # Not enough completed bars to seed yet, but the forming bar completes the
+            # first period: seed from every buffered close, as the seed step would
+            avg_gain, avg_loss = _indicators.wilder_averages(c.values, self.rsi_period)
+        else:
             return None
-            
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
         
         if avg_loss == 0:
             return 100
         
         rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return 100 - (100 / (1 + rs))
     
-    def calculate_momentum(self, prices, period=10):
-        """Calculate momentum (rate of change)"""
-        if len(prices) < period:
-            return None
-            
-        current_price = prices[-1]
-        past_price = prices[-period]
-        momentum = ((current_price - past_price) / past_price) * 100
-        return momentum
+    def calculate_momentum(self, prices: np.ndarray):
+        """Calculate momentum (rate of change) over momentum_period"""
+        momentum = _indicators.momentum_pct(prices, self.momentum_period)
+        return None if math.isnan(momentum) else momentum
     
     def check_signals(self):
         """Check for momentum signals"""
-        if len(self.bars) < max(self.rsi_period, self.momentum_period):
+        if len(self.bars) < self._warmup:
+            return
+        if self._order_task and not self._order_task.done():
+            # Still waiting on the last order
             return
             
         # Calculate indicators
-        closes = [bar.close for bar in self.bars]
-        rsi = self.calculate_rsi(closes, self.rsi_period)
-        momentum = self.calculate_momentum(closes, self.momentum_period)
+        closes = self._closes.values
+        rsi = self.calculate_rsi()
+        momentum = self.calculate_momentum(closes)
         
         if rsi is None or momentum is None:
             return
             
-        log(f"Current Price: ${closes[-1]:.2f}, RSI: {rsi:.2f}, Momentum: {momentum:.2f}%")
-        
-        # Check for entry signals
-        if not self.in_trade:
-            # Buy when RSI is oversold and momentum is turning positive
-            if rsi < self.rsi_oversold and momentum > 0:
-                self.buy()
-            # Sell short when RSI is overbought and momentum is turning negative
-            elif rsi > self.rsi_overbought and momentum < 0:
-                log(f"Short signal detected (RSI: {rsi:.2f}, Momentum: {momentum:.2f}%) but shorting not implemented")
-        
-        # Check for exit signals
-        elif self.in_trade:
-            # Exit long position when RSI becomes overbought or momentum weakens
-            if rsi > self.rsi_overbought or momentum < -2.0:
-                self.sell()
-    
-    def buy(self):
+        if LOG_LEVEL >= 2:
+            log(f"Current Price: ${closes[-1]:.2f}, RSI: {rsi:.2f}, Momentum: {momentum:.2f}%")
+        
+        # Evaluate every condition up front and dispatch once through _SIGNAL_ACTIONS:
+        #   flat:     buy when RSI is oversold and momentum is turning positive,
+        #             else flag a short when RSI is overbought and momentum is turning negative
+        #   in trade: exit the long when RSI becomes overbought or momentum weakens
+        in_trade = self.in_trade
+        want_long = rsi < self.rsi_oversold and momentum > 0
+        want_short = rsi > self.rsi_overbought and momentum < 0
+        want_exit = rsi > self.rsi_overbought or momentum < -2.0
+        action = _SIGNAL_ACTIONS[(in_trade << 2) | (want_long << 1) | (want_exit if in_trade else want_short)]
+        
+        if action == "buy":
+            self._order_task = asyncio.ensure_future(self.buy())
+        elif action == "sell":
+            self._order_task = asyncio.ensure_future(self.sell())
+        elif action == "short":
+            log(f"Short signal detected (RSI: {rsi:.2f}, Momentum: {momentum:.2f}%) but shorting not implemented")
+    
+    async def _wait_filled(self, trade, timeout: float = 5.0):
+        """Wait until the order is filled, cancelled or rejected (or the timeout passes)"""
+        # statusEvent fires on every status change (Submitted, Filled, Cancelled, ...);
+        # stop at the first terminal one, so a rejected order returns at once
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not trade.isDone():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(trade.statusEvent, timeout=remaining)
+            except asyncio.TimeoutError:
+                return
+    
+    async def buy(self):
         """Execute buy order"""
         try:
             order = MarketOrder('BUY', 100)  # Buy 100 shares
             trade = self.ib.placeOrder(self.underlying, order)
-            self.ib.sleep(1)  # Wait for order to be processed
+            await self._wait_filled(trade)
             
             if trade.orderStatus.status == 'Filled':
                 self.in_trade = True
@@ -198,12 +278,12 @@ class Momentum:
         except Exception as e:
             log(f"Error executing buy order: {e}")
     
-    def sell(self):
+    async def sell(self):
         """Execute sell order"""
         try:
             order = MarketOrder('SELL', self.position)
             trade = self.ib.placeOrder(self.underlying, order)
-            self.ib.sleep(1)  # Wait for order to be processed
+            await self._wait_filled(trade)
             
             if trade.orderStatus.status == 'Filled':
                 exit_price = trade.orderStatus.avgFillPrice
@@ -223,15 +303,19 @@ class Momentum:
         except Exception as e:
             log(f"Error executing sell order: {e}")
     
-    def stop(self):
+    async def stop(self):
         """Stop the strategy and close any open positions"""
+        if self._order_task and not self._order_task.done():
+            await self._order_task
         if self.in_trade:
             log("Closing open position before stopping...")
-            self.sell()
+            await self.sell()
         
         # Disconnect from bar updates
         if hasattr(self, 'bars') and self.bars:
             self.bars.updateEvent -= self.on_bar_update
+            HistoricalBarsCache.release(self.ib, self.bars)
+            self.bars = None
         
         log("Momentum strategy stopped")
 
@@ -239,5 +323,5 @@ class Momentum:
 # Helper function for logging
 def log(message):
     """Simple logging function"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
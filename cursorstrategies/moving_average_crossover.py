@@ -8,8 +8,11 @@ from ib_async import IB, Stock, MarketOrder, util
 from ib_async.objects import BarData
 from datetime import datetime, timezone, timedelta
 import asyncio
+import time
 import numpy as np
 
+from cursorstrategies._bars import CloseBuffer, HistoricalBarsCache
+
 class MovingAverageCrossoverStrategy(Strategy):
     """
     Moving Average Crossover Strategy
@@ -19,6 +22,15 @@ class MovingAverageCrossoverStrategy(Strategy):
     
     name = "MovingAverageCrossover"
     
+    def __init__(self):
+        super().__init__()
+        # Set by stop() to end the run early
+        self._stop_event = asyncio.Event()
+    
+    def stop(self):
+        """Ask a running strategy to close out and return"""
+        self._stop_event.set()
+    
     async def run(self, ib, params, log):
         """
         Main strategy execution method called by the strategy runner
@@ -52,13 +64,18 @@ class MovingAverageCrossoverStrategy(Strategy):
             strategy = MovingAverageCrossover(
                 ib, ticker, account, fast_period, slow_period
             )
+            await strategy.setup()
             
-            # Run for a limited time (e.g., 1 hour) to demonstrate
+            # Run for a limited time (e.g., 1 hour) to demonstrate, or until stop() is called
             log(f"Strategy started, running for 1 hour...")
-            await asyncio.sleep(3600)  # Run for 1 hour
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=3600)
+                log("Stop requested")
+            except asyncio.TimeoutError:
+                pass
             
             # Stop the strategy
-            strategy.stop()
+            await strategy.stop()
             log(f"{self.name} strategy completed successfully!")
             return True
             
@@ -79,71 +96,147 @@ class MovingAverageCrossover:
         self.account = account
         self.fast_period = fast_period
         self.slow_period = slow_period
+        # Bars needed before a crossover (current and previous slow MA) can be evaluated
+        self._prev_needed = slow_period + 1
         self.in_trade = False
         self.position = 0
         self.entry_price = None
+        self.bars = None
+        # Order placed from a bar update that hasn't completed yet
+        self._order_task = None
         
-        if not self.ib.isConnected():
-            print("⚠️ IB is not connected. Connect before constructing the strategy.")
-            
         # Underlying stock
         self.underlying = Stock(self.ticker, 'SMART', 'USD')
-        self.ib.qualifyContracts(self.underlying)
-        
-        # Historical bars for calculating moving averages
-        self.bars = self.ib.reqHistoricalData(
-            self.underlying,
-            endDateTime='',
-            durationStr='30 D',
-            barSizeSetting='1 day',
-            whatToShow='TRADES',
-            useRTH=True,
-            keepUpToDate=True,
-            formatDate=1
-        )
+    
+    async def setup(self):
+        """Qualify the contract and subscribe to bars (must run inside the event loop)"""
+        if not self.ib.isConnected():
+            print("⚠️ IB is not connected. Connect before setting up the strategy.")
+            
+        await self.ib.qualifyContractsAsync(self.underlying)
+        
+        # Historical bars for calculating moving averages (shared with other strategies on this ticker)
+        self.bars = await HistoricalBarsCache.acquire(self.ib, self.underlying, '30 D', '1 day')
+        
+        # Close series, updated per bar; the sums below only reach slow_period + 1 back
+        self._closes = CloseBuffer(self.bars, keep=self.slow_period + 2)
+        
+        # Running sums of the last fast/slow *completed* closes (the window ending at
+        # the bar before the current one); updated in O(1) per bar
+        self._prev_fast_sum = None
+        self._prev_slow_sum = None
+        if len(self._closes) >= self._prev_needed:
+            self._seed_sums(self._closes.values[:-1])
         
         # Set up bar update handler
         self.bars.updateEvent += self.on_bar_update
         
-        log(f"Moving Average Crossover strategy initialized for {ticker}")
-        log(f"Fast MA: {fast_period}, Slow MA: {slow_period}")
+        log(f"Moving Average Crossover strategy initialized for {self.ticker}")
+        log(f"Fast MA: {self.fast_period}, Slow MA: {self.slow_period}")
+    
+    def _seed_sums(self, completed: np.ndarray):
+        """Sum the completed closes once; later bars update the sums incrementally"""
+        self._prev_slow_sum = float(completed[-self.slow_period:].sum())
+        self._prev_fast_sum = float(completed[-self.fast_period:].sum())
     
     def on_bar_update(self, bars, has_new_bar):
         """Handle new bar updates"""
-        if has_new_bar and len(bars) >= self.slow_period:
+        if not has_new_bar:
+            return
+        closes = self._closes
+        if len(bars) >= 2:
+            closes.complete_last(bars[-2].close)
+            if self._prev_slow_sum is None:
+                if len(closes) >= self.slow_period:
+                    self._seed_sums(closes.values)
+            else:
+                # The newest buffered bar just completed: slide both windows forward
+                new = closes[-1]
+                self._prev_fast_sum += new - closes[-1 - self.fast_period]
+                self._prev_slow_sum += new - closes[-1 - self.slow_period]
+        closes.append(bars[-1].close)
+        if len(bars) >= self.slow_period:
             self.check_signals()
     
     def check_signals(self):
         """Check for moving average crossover signals"""
         if len(self.bars) < self.slow_period:
             return
+        if self._order_task and not self._order_task.done():
+            # Still waiting on the last order
+            return
             
-        # Calculate moving averages
-        closes = [bar.close for bar in self.bars]
-        fast_ma = np.mean(closes[-self.fast_period:])
-        slow_ma = np.mean(closes[-self.slow_period:])
-        
         # Previous values for crossover detection
-        if len(closes) >= self.slow_period + 1:
-            prev_fast_ma = np.mean(closes[-(self.fast_period+1):-1])
-            prev_slow_ma = np.mean(closes[-(self.slow_period+1):-1])
+        if self._prev_slow_sum is not None:
+            fast, slow = self.fast_period, self.slow_period
+            prev_fast_ma = self._prev_fast_sum / fast
+            prev_slow_ma = self._prev_slow_sum / slow
+            
+            # Current values: slide in the forming bar's close
+            closes = self._closes
+            current = closes[-1]
+            fast_ma = (self._prev_fast_sum - closes[-1 - fast] + current) / fast
+            slow_ma = (self._prev_slow_sum - closes[-1 - slow] + current) / slow
             
             # Check for crossover
             if prev_fast_ma <= prev_slow_ma and fast_ma > slow_ma:
                 # Golden cross - buy signal
                 if not self.in_trade:
-                    self.buy()
+                    self._order_task = asyncio.ensure_future(self.buy())
             elif prev_fast_ma >= prev_slow_ma and fast_ma < slow_ma:
                 # Death cross - sell signal
                 if self.in_trade:
-                    self.sell()
+                    self._order_task = asyncio.ensure_future(self.sell())
     
-    def buy(self):
+    @staticmethod
+    def backtest(closes, fast_period: int = 10, slow_period: int = 20) -> np.ndarray:
+        """
+        Crossover signals for a whole close series at once (offline/backtest use).
+        
+        Returns an int8 array aligned with `closes`: +1 where check_signals would
+        see a golden cross on that bar, -1 for a death cross, 0 otherwise. All
+        rolling means come from one prefix sum, so the cost is O(len(closes))
+        rather than O(len(closes) * slow_period).
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        n = len(closes)
+        signals = np.zeros(n, dtype=np.int8)
+        if n < slow_period + 1:
+            return signals
+        
+        cs = np.concatenate(([0.0], np.cumsum(closes)))
+        # Means of the windows ending at bar t, for t = slow_period - 1 .. n - 1
+        slow = (cs[slow_period:] - cs[:-slow_period]) / slow_period
+        fast = ((cs[fast_period:] - cs[:-fast_period]) / fast_period)[slow_period - fast_period:]
+        spread = fast - slow
+        prev, cur = spread[:-1], spread[1:]
+        
+        golden = (prev <= 0) & (cur > 0)
+        death = (prev >= 0) & (cur < 0)
+        signals[slow_period:] = golden.astype(np.int8) - death.astype(np.int8)
+        return signals
+    
+    async def _wait_filled(self, trade, timeout: float = 5.0):
+        """Wait until the order is filled, cancelled or rejected (or the timeout passes)"""
+        # statusEvent fires on every status change (Submitted, Filled, Cancelled, ...);
+        # stop at the first terminal one, so a rejected order returns at once
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not trade.isDone():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(trade.statusEvent, timeout=remaining)
+            except asyncio.TimeoutError:
+                return
+    
+    async def buy(self):
         """Execute buy order"""
         try:
             order = MarketOrder('BUY', 100)  # Buy 100 shares
             trade = self.ib.placeOrder(self.underlying, order)
-            self.ib.sleep(1)  # Wait for order to be processed
+            await self._wait_filled(trade)
             
             if trade.orderStatus.status == 'Filled':
                 self.in_trade = True
@@ -156,12 +249,12 @@ class MovingAverageCrossover:
         except Exception as e:
             log(f"Error executing buy order: {e}")
     
-    def sell(self):
+    async def sell(self):
         """Execute sell order"""
         try:
             order = MarketOrder('SELL', self.position)
             trade = self.ib.placeOrder(self.underlying, order)
-            self.ib.sleep(1)  # Wait for order to be processed
+            await self._wait_filled(trade)
             
             if trade.orderStatus.status == 'Filled':
                 exit_price = trade.orderStatus.avgFillPrice
@@ -178,15 +271,19 @@ class MovingAverageCrossover:
         except Exception as e:
             log(f"Error executing sell order: {e}")
     
-    def stop(self):
+    async def stop(self):
         """Stop the strategy and close any open positions"""
+        if self._order_task and not self._order_task.done():
+            await self._order_task
         if self.in_trade:
             log("Closing open position before stopping...")
-            self.sell()
+            await self.sell()
         
         # Disconnect from bar updates
         if hasattr(self, 'bars') and self.bars:
             self.bars.updateEvent -= self.on_bar_update
+            HistoricalBarsCache.release(self.ib, self.bars)
+            self.bars = None
         
         log("Moving Average Crossover strategy stopped")
 
@@ -194,5 +291,5 @@ class MovingAverageCrossover:
 # Helper function for logging
 def log(message):
     """Simple logging function"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
@@ -24,8 +24,10 @@ import argparse
 import traceback
 from typing import Dict, Any
 
-# Ensure app/ is importable
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+# Ensure app/ is importable (once; a duplicate entry would be scanned on every import)
+_APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app')
+if _APP_DIR not in sys.path:
+    sys.path.insert(0, _APP_DIR)
 
 
 def enable_loop_tracing():
@@ -48,34 +50,45 @@ def enable_loop_tracing():
     _aio.AbstractEventLoop.run_until_complete = spy
 
 
+def _coerce_value(value: str) -> Any:
+    """Convert a parameter value to bool/int/float, else return it unchanged"""
+    low = value.lower()
+    if low in ('true', 'false'):
+        return low == 'true'
+    body = value[1:] if value[:1] in ('+', '-') else value
+    if '.' not in value:
+        return int(value) if body.isdecimal() else value
+    if body.replace('.', '', 1).isdecimal():
+        return float(value)
+    # Rare forms such as 1.5e3 still go through float()
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _split_list(value: str) -> list:
+    """Split a comma-separated CLI value, dropping blanks (single value fast path)"""
+    if ',' not in value:
+        value = value.strip()
+        return [value] if value else []
+    return [x for x in (p.strip() for p in value.split(',')) if x]
+
+
 def parse_parameters(param_string: str) -> Dict[str, Any]:
     """Parse parameter string in format key1=value1,key2=value2"""
     params: Dict[str, Any] = {}
     if not param_string:
         return params
     for item in param_string.split(','):
-        item = item.strip()
-        if not item:
-            continue
-        if '=' in item:
-            key, value = item.split('=', 1)
-            key = key.strip()
-            value = value.strip()
-            # Try to convert to bool/int/float
-            try:
-                low = value.lower()
-                if low in ('true', 'false'):
-                    params[key] = (low == 'true')
-                else:
-                    if '.' in value:
-                        params[key] = float(value)
-                    else:
-                        params[key] = int(value)
-            except Exception:
-                params[key] = value
+        key, sep, value = item.partition('=')
+        if sep:
+            params[key.strip()] = _coerce_value(value.strip())
         else:
-            # flag without value → True
-            params[item] = True
+            key = key.strip()
+            if key:
+                # flag without value → True
+                params[key] = True
     return params
 
 
@@ -90,13 +103,10 @@ async def run_strategy_from_file(strategy_file: str, strategy_filename: str, par
 
         print(f"🚀 Loading strategy from: {strategy_file}")
 
-        # Load the strategy class from file
-        strategy_class = file_strategy_loader.load_strategy_from_file(strategy_filename)
-        if not strategy_class:
-            print(f"❌ Failed to load strategy from {strategy_file}")
-            return False
-
-        print(f"✅ Strategy loaded: {strategy_class.name}")
+        # Load the strategy class (disk I/O + compile) in a worker thread while we connect
+        load_task = asyncio.create_task(
+            asyncio.to_thread(file_strategy_loader.load_strategy_from_file, strategy_filename)
+        )
 
         # Start connection manager (NO loop juggling here)
         print("🔌 Starting connection manager...")
@@ -108,8 +118,16 @@ async def run_strategy_from_file(strategy_file: str, strategy_filename: str, par
 
         print(f"🔗 Connecting to {connection_type} trading...")
 
-        # Ensure connection (async)
-        ok = await connection_manager.ensure_connection(connection_type)
+        # Ensure connection (async); the strategy load finishes alongside it
+        strategy_class, ok = await asyncio.gather(
+            load_task, connection_manager.ensure_connection(connection_type)
+        )
+        if not strategy_class:
+            print(f"❌ Failed to load strategy from {strategy_file}")
+            return False
+
+        print(f"✅ Strategy loaded: {strategy_class.name}")
+
         if not ok:
             print(f"❌ Failed to establish {connection_type} trading connection")
             return False
@@ -219,13 +237,14 @@ async def main():
 
         ib = IBManager.instance().ib
         loop = asyncio.get_running_loop()
-        print(f"diag: loop_id={id(loop)} connected={ib.isConnected()}")
+        print(f"diag: loop={type(loop).__name__} loop_id={id(loop)} connected={ib.isConnected()}")
 
         # Use async IB APIs + asyncio sleep only
         try:
             for i in range(3):
+                t0 = loop.time()
                 ct = await ib.reqCurrentTimeAsync()
-                print(f"diag[{i}] currentTime={ct}")
+                print(f"diag[{i}] currentTime={ct} rtt={(loop.time() - t0) * 1000:.1f}ms")
                 await asyncio.sleep(0.3)
             await connection_manager.stop()
             print("✅ diag: async calls succeeded on one loop")
@@ -250,8 +269,8 @@ async def main():
     # Build params
     strategy_filename = os.path.basename(args.strategy_file)
     params: Dict[str, Any] = {
-        'tickers': [t.strip() for t in args.tickers.split(',') if t.strip()],
-        'accounts': [a.strip() for a in args.accounts.split(',') if a.strip()],
+        'tickers': _split_list(args.tickers),
+        'accounts': _split_list(args.accounts),
         'paper_trading': args.paper_trading and not args.real_trading,
         'strategy_name': os.path.splitext(strategy_filename)[0],
     }
@@ -281,8 +300,10 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        # Windows: prefer selector policy for better asyncio/ib_async behavior
-        if sys.platform.startswith("win"):
+        # Windows: prefer selector policy for better asyncio/ib_async behavior.
+        # IB_USE_PROACTOR=1 keeps Python's default IOCP-based Proactor loop instead
+        # (compare the two with --diag-loop).
+        if sys.platform.startswith("win") and not os.environ.get("IB_USE_PROACTOR"):
             asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
         asyncio.run(main())
     except KeyboardInterrupt:
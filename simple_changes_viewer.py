@@ -7,12 +7,20 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 import os
-import subprocess
+import asyncio
 import json
-from datetime import datetime
-from typing import List, Dict, Optional
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Awaitable, Callable, List, Dict, Optional, Tuple
 import uvicorn
 
+try:
+    import pygit2
+except ImportError:  # optional: without it every Git operation shells out to git
+    pygit2 = None
+
 app = FastAPI(
     title="Simple Changes Viewer",
     description="View Git changes in your trading strategies",
@@ -22,31 +30,93 @@ app = FastAPI(
 # Set up templates
 templates = Jinja2Templates(directory="templates")
 
+# Use full path to git.exe since PATH might not be updated in server process
+GIT_PATH = r"C:\Program Files\Git\bin\git.exe"
+
 class SimpleChangesViewer:
     """Handles Git operations and change tracking"""
     
+    # Seconds a git result is reused before the command is run again
+    STATUS_TTL = 1.0
+    HISTORY_TTL = 5.0
+    # Upper bound for /api/history?limit=N; also bounds the distinct history cache keys
+    MAX_HISTORY = 100
+    
     def __init__(self, repo_path: str = "."):
         self.repo_path = repo_path
+        # (command, args) -> (monotonic expiry time, result); expired entries are
+        # swept whenever a new result is stored
+        self._cache: Dict[Tuple, Tuple[float, Any]] = {}
+        self._cache_lock = threading.Lock()
+        # (command, args) -> task computing it, shared by concurrent misses
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        # In-process libgit2 handle when pygit2 is installed (no fork/exec per request).
+        # Its calls block, so they run in worker threads, one at a time under _repo_lock.
+        self.repo = None
+        self._repo_lock = threading.Lock()
+        if pygit2 is not None:
+            try:
+                self.repo = pygit2.Repository(repo_path)
+            except Exception as e:
+                print(f"⚠️ pygit2 unavailable for {repo_path}, using git executable: {e}")
+    
+    async def _cached(self, key: Tuple, ttl: float, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return await fn(), reusing a result computed less than `ttl` seconds ago.
+        
+        Concurrent misses for the same key share one call of fn().
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit and now < hit[0]:
+                return hit[1]
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._fill(key, now + ttl, fn))
+                self._inflight[key] = task
+        # shield: one cancelled request must not cancel the others' shared call
+        return await asyncio.shield(task)
+    
+    async def _fill(self, key: Tuple, expires: float, fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fn()
+        finally:
+            with self._cache_lock:
+                del self._inflight[key]
+        now = time.monotonic()
+        with self._cache_lock:
+            for stale in [k for k, (exp, _) in self._cache.items() if exp <= now]:
+                del self._cache[stale]
+            self._cache[key] = (expires, value)
+        return value
+    
+    async def _run(self, *args: str) -> Tuple[int, bytes]:
+        """Run a git command without blocking the event loop; returns (returncode, raw stdout)"""
+        proc = await asyncio.create_subprocess_exec(
+            GIT_PATH, *args,
+            cwd=self.repo_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        out, _ = await proc.communicate()
+        return proc.returncode, out
     
-    def get_git_status(self) -> Dict:
+    async def get_git_status(self) -> Dict:
         """Get current Git status"""
         try:
-            # Use full path to git.exe since PATH might not be updated in server process
-            git_path = r"C:\Program Files\Git\bin\git.exe"
+            if self.repo is not None:
+                return await self._cached(("status",), self.STATUS_TTL, lambda: self._in_thread(self._status_in_process))
             
-            # Check if Git is available
-            result = subprocess.run(
-                [git_path, "status", "--porcelain"],
-                capture_output=True,
-                text=True,
-                cwd=self.repo_path
+            # Check if Git is available (-z: NUL-terminated, unquoted paths)
+            returncode, stdout = await self._cached(
+                ("status", "--porcelain", "-z"), self.STATUS_TTL,
+                lambda: self._run("status", "--porcelain", "-z")
             )
             
-            if result.returncode != 0:
+            if returncode != 0:
                 return {"error": "Git not available or not a repository"}
             
-            # Parse git status
-            status_lines = result.stdout.strip().split('\n') if result.stdout.strip() else []
+            # Parse git status: "XY path", X = index column, Y = worktree column
             changes = {
                 "modified": [],
                 "added": [],
@@ -54,82 +124,176 @@ class SimpleChangesViewer:
                 "untracked": []
             }
             
-            for line in status_lines:
-                if line:
-                    status = line[:2]
-                    filename = line[3:]
-                    
-                    if status == "M ":
-                        changes["modified"].append(filename)
-                    elif status == "A ":
-                        changes["added"].append(filename)
-                    elif status == "D ":
-                        changes["deleted"].append(filename)
-                    elif status == "??":
-                        changes["untracked"].append(filename)
+            entries = iter(stdout.decode('utf-8', errors='replace').split('\0'))
+            for entry in entries:
+                if not entry:
+                    continue
+                x, y = entry[0], entry[1]
+                filename = entry[3:]
+                if x in "RC":
+                    # Renames/copies are followed by the original path
+                    next(entries, None)
+                
+                if x == "?" and y == "?":
+                    changes["untracked"].append(filename)
+                elif x == "M" or y == "M":
+                    changes["modified"].append(filename)
+                elif x == "A" or y == "A":
+                    changes["added"].append(filename)
+                elif x == "D" or y == "D":
+                    changes["deleted"].append(filename)
             
             return changes
             
         except Exception as e:
             return {"error": f"Error getting Git status: {str(e)}"}
     
-    def get_file_diff(self, filename: str) -> Optional[str]:
+    async def get_file_diff(self, filename: str) -> Optional[str]:
         """Get diff for a specific file"""
         try:
-            git_path = r"C:\Program Files\Git\bin\git.exe"
-            result = subprocess.run(
-                [git_path, "diff", filename],
-                capture_output=True,
-                text=True,
-                cwd=self.repo_path
+            if self.repo is not None:
+                return await self._cached(("diff", filename), self.STATUS_TTL, lambda: self._in_thread(self._diff_in_process, filename))
+            
+            returncode, stdout = await self._cached(
+                ("diff", filename), self.STATUS_TTL,
+                lambda: self._run("diff", "--", filename)
             )
             
-            if result.returncode == 0 and result.stdout:
-                return result.stdout
+            if returncode == 0 and stdout:
+                return stdout.decode('utf-8', errors='replace')
             return None
             
         except Exception:
             return None
     
-    def get_commit_history(self, limit: int = 10) -> List[Dict]:
+    async def get_commit_history(self, limit: int = 10) -> List[Dict]:
         """Get recent commit history"""
+        limit = max(1, min(limit, self.MAX_HISTORY))
         try:
-            git_path = r"C:\Program Files\Git\bin\git.exe"
-            result = subprocess.run(
-                [git_path, "log", f"--max-count={limit}", "--pretty=format:%H|%an|%ad|%s", "--date=short"],
-                capture_output=True,
-                text=True,
-                cwd=self.repo_path
+            if self.repo is not None:
+                return await self._cached(("log", limit), self.HISTORY_TTL, lambda: self._in_thread(self._history_in_process, limit))
+            
+            returncode, stdout = await self._cached(
+                ("log", limit), self.HISTORY_TTL,
+                lambda: self._run("log", "-z", f"--max-count={limit}", "--pretty=format:%H%x1f%an%x1f%ad%x1f%s", "--date=short")
             )
             
-            if result.returncode != 0:
+            if returncode != 0:
                 return []
             
-            commits = []
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    parts = line.split('|')
-                    if len(parts) == 4:
-                        commits.append({
-                            "hash": parts[0][:8],
-                            "author": parts[1],
-                            "date": parts[2],
-                            "message": parts[3]
-                        })
-            
-            return commits
+            # NUL between commits, unit separator between fields, so "|" in a subject is safe.
+            # Split the raw bytes and decode only the fields that are returned; maxsplit
+            # keeps the subject whole.
+            records = (record.split(b'\x1f', 3) for record in stdout.split(b'\0') if record)
+            return [
+                {
+                    "hash": commit_hash[:8].decode('ascii'),
+                    "author": author.decode('utf-8', errors='replace'),
+                    "date": date.decode('ascii'),
+                    "message": message.decode('utf-8', errors='replace')
+                }
+                for commit_hash, author, date, message in records
+            ]
             
         except Exception:
             return []
     
+    async def _in_thread(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking libgit2 helper in a worker thread"""
+        def locked():
+            with self._repo_lock:
+                return fn(*args)
+        return await asyncio.to_thread(locked)
+    
+    def _status_in_process(self) -> Dict:
+        """get_git_status() via libgit2, classified like the porcelain parser"""
+        changes = {
+            "modified": [],
+            "added": [],
+            "deleted": [],
+            "untracked": []
+        }
+        for filename, flags in sorted(self.repo.status().items()):
+            if flags & pygit2.GIT_STATUS_WT_NEW:
+                # Untracked; can coincide with INDEX_DELETED (git rm --cached), which
+                # porcelain reports as two entries
+                changes["untracked"].append(filename)
+            if flags & (pygit2.GIT_STATUS_INDEX_MODIFIED | pygit2.GIT_STATUS_WT_MODIFIED):
+                changes["modified"].append(filename)
+            elif flags & pygit2.GIT_STATUS_INDEX_NEW:
+                changes["added"].append(filename)
+            elif flags & (pygit2.GIT_STATUS_INDEX_DELETED | pygit2.GIT_STATUS_WT_DELETED):
+                changes["deleted"].append(filename)
+        return changes
+    
+    def _diff_in_process(self, filename: str) -> Optional[str]:
+        """get_file_diff() via libgit2: worktree against index, like `git diff <file>`"""
+        try:
+            flags = self.repo.status_file(filename)
+        except KeyError:
+            # Not in the index or worktree
+            return None
+        if not flags & (pygit2.GIT_STATUS_WT_MODIFIED | pygit2.GIT_STATUS_WT_DELETED |
+                        pygit2.GIT_STATUS_WT_TYPECHANGE):
+            return None
+        # Only the matching delta gets a patch (and its content read)
+        diff = self.repo.diff()
+        for i, delta in enumerate(diff.deltas):
+            if delta.new_file.path == filename:
+                return diff[i].text or None
+        return None
+    
+    def _history_in_process(self, limit: int) -> List[Dict]:
+        """get_commit_history() via libgit2"""
+        try:
+            head = self.repo.head.target
+        except pygit2.GitError:
+            # No commits yet
+            return []
+        commits = []
+        for commit in islice(self.repo.walk(head, pygit2.GIT_SORT_TIME), limit):
+            author = commit.author
+            tz = timezone(timedelta(minutes=author.offset))
+            commits.append({
+                "hash": str(commit.id)[:8],
+                "author": author.name,
+                "date": datetime.fromtimestamp(author.time, tz).strftime("%Y-%m-%d"),
+                "message": commit.message.split('\n', 1)[0]
+            })
+        return commits
+    
+    async def is_repo_path(self, filename: str) -> bool:
+        """True if `filename` is tracked or untracked-but-not-ignored in the repository"""
+        return filename in await self._cached(("ls-files",), self.HISTORY_TTL, self._list_repo_paths)
+    
+    async def _list_repo_paths(self) -> frozenset:
+        if self.repo is not None:
+            return await self._in_thread(self._repo_paths_in_process)
+        
+        try:
+            returncode, stdout = await self._run("ls-files", "-z", "--cached", "--others", "--exclude-standard")
+        except OSError:
+            # git executable missing; no path validates rather than a 500
+            return frozenset()
+        if returncode != 0:
+            return frozenset()
+        return frozenset(stdout.decode('utf-8', errors='replace').split('\0')) - {''}
+    
+    def _repo_paths_in_process(self) -> frozenset:
+        """_list_repo_paths() via libgit2: index entries plus untracked, unignored files"""
+        index = self.repo.index
+        index.read()
+        paths = {entry.path for entry in index}
+        paths.update(path for path, flags in self.repo.status().items() if flags & pygit2.GIT_STATUS_WT_NEW)
+        return frozenset(paths)
+    
     def get_file_content(self, filename: str, show_untracked: bool = False) -> Optional[str]:
         """Get current content of a file"""
+        # open() failing covers the missing-file case, so no separate exists() stat
         try:
-            if show_untracked or os.path.exists(filename):
-                with open(filename, 'r', encoding='utf-8') as f:
-                    return f.read()
-            return None
-        except Exception:
+            with open(filename, 'rb') as f:
+                return f.read().decode('utf-8', errors='replace')
+        except OSError:
             return None
 
 # Initialize changes viewer
@@ -138,8 +302,10 @@ changes_viewer = SimpleChangesViewer()
 @app.get("/", response_class=HTMLResponse)
 async def view_changes(request: Request):
     """Main changes viewer page"""
-    git_status = changes_viewer.get_git_status()
-    commit_history = changes_viewer.get_commit_history()
+    git_status, commit_history = await asyncio.gather(
+        changes_viewer.get_git_status(),
+        changes_viewer.get_commit_history()
+    )
     
     return templates.TemplateResponse(
         "changes.html",
@@ -154,7 +320,10 @@ async def view_changes(request: Request):
 @app.get("/diff/{filename:path}")
 async def get_file_diff(filename: str):
     """Get diff for a specific file"""
-    diff = changes_viewer.get_file_diff(filename)
+    # Only repository paths reach git / the filesystem (no traversal, no option injection)
+    if not await changes_viewer.is_repo_path(filename):
+        raise HTTPException(status_code=400, detail="Not a repository file")
+    diff = await changes_viewer.get_file_diff(filename)
     if diff is None:
         raise HTTPException(status_code=404, detail="No changes found for file")
     
@@ -163,6 +332,8 @@ async def get_file_diff(filename: str):
 @app.get("/content/{filename:path}")
 async def get_file_content(filename: str):
     """Get current content of a file"""
+    if not await changes_viewer.is_repo_path(filename):
+        raise HTTPException(status_code=400, detail="Not a repository file")
     content = changes_viewer.get_file_content(filename, show_untracked=True)
     if content is None:
         raise HTTPException(status_code=404, detail="File not found")
@@ -172,12 +343,12 @@ async def get_file_content(filename: str):
 @app.get("/api/status")
 async def get_git_status():
     """Get current Git status as JSON"""
-    return changes_viewer.get_git_status()
+    return await changes_viewer.get_git_status()
 
 @app.get("/api/history")
 async def get_commit_history(limit: int = 10):
     """Get commit history as JSON"""
-    return changes_viewer.get_commit_history(limit)
+    return await changes_viewer.get_commit_history(limit)
 
 @app.get("/health")
 async def health_check():
@@ -6,15 +6,42 @@ from strategies.base import Strategy
 from ib_insync import Option, MarketOrder, ComboLeg, Contract
 from app.ib_adapter import qualify, place_order, wait_for_completion, create_option_contract, create_combo_contract, create_combo_leg
 
+# Parameter schemas: (name, converter or None, default, required), built once at import
+_IRON_FLY_PARAMS = (
+    ("symbol", None, "SPX", False),
+    ("expiry", None, None, False),  # e.g. "2025-08-08"
+    ("mid_strike", float, None, True),
+    ("width", int, 25, False),
+    ("qty", int, 1, False),
+)
+_SHORT_PUT_SPREAD_PARAMS = (
+    ("symbol", None, "SPX", False),
+    ("expiry", None, None, False),
+    ("short_strike", float, None, True),
+    ("long_strike", float, None, True),
+    ("qty", int, 1, False),
+)
+_SIMPLE_CALL_PARAMS = (
+    ("symbol", None, "SPX", False),
+    ("expiry", None, None, False),
+    ("strike", float, None, True),
+    ("qty", int, 1, False),
+)
+
+
+def _parse_params(params: dict, schema) -> tuple:
+    """Read and convert the parameters named in `schema`, in schema order"""
+    values = []
+    for name, conv, default, required in schema:
+        value = params[name] if required else params.get(name, default)
+        values.append(value if conv is None else conv(value))
+    return tuple(values)
+
 class ExampleIronFly(Strategy):
     name = "Example: Iron Butterfly (ib_insync demo)"
 
     async def run(self, ib, params, log):
-        symbol = params.get("symbol", "SPX")
-        expiry = params.get("expiry")  # e.g. "2025-08-08"
-        mid = float(params.get("mid_strike"))
-        width = int(params.get("width", 25))
-        qty = int(params.get("qty", 1))
+        symbol, expiry, mid, width, qty = _parse_params(params, _IRON_FLY_PARAMS)
 
         log(f"Creating Iron Butterfly: {symbol} {expiry} {mid}±{width}")
 
@@ -53,11 +80,7 @@ class ShortPutSpread(Strategy):
     name = "Short Put Spread (ib_insync)"
 
     async def run(self, ib, params, log):
-        symbol = params.get("symbol", "SPX")
-        expiry = params.get("expiry")  # "2025-08-08"
-        short_strike = float(params["short_strike"])
-        long_strike = float(params["long_strike"])
-        qty = int(params.get("qty", 1))
+        symbol, expiry, short_strike, long_strike, qty = _parse_params(params, _SHORT_PUT_SPREAD_PARAMS)
 
         log(f"Creating Short Put Spread: {symbol} {expiry} {short_strike}/{long_strike}")
 
@@ -92,10 +115,7 @@ class SimpleCallBuy(Strategy):
     name = "Simple Call Buy (ib_insync)"
 
     async def run(self, ib, params, log):
-        symbol = params.get("symbol", "SPX")
-        expiry = params.get("expiry")  # "2025-08-08"
-        strike = float(params["strike"])
-        qty = int(params.get("qty", 1))
+        symbol, expiry, strike, qty = _parse_params(params, _SIMPLE_CALL_PARAMS)
 
         log(f"Buying {qty} {symbol} {expiry} {strike} Call")
 
@@ -1,9 +1,76 @@
 # RiskyOptionsBot Strategy (ib_async version)
 from strategies.base import Strategy
 from ib_async import IB, Stock, Option, MarketOrder, util
-from ib_async.objects import BarData
+from ib_async.objects import BarData, OptionChain
 from datetime import datetime, timezone, timedelta
+from pathlib import Path
 import asyncio
+import bisect
+import json
+import os
+import time
+import weakref
+from functools import partial
+from typing import Callable
+
+import numpy as np
+
+# On-disk option-chain cache, shared by bot processes: .cache/chains/{symbol}/{conId}_{YYYYMMDD}.json.
+# Plain JSON data (never pickle), so a file dropped there can't run code in the bot.
+CHAIN_CACHE_DIR = Path(".cache") / "chains"
+CHAIN_CACHE_TTL = 15 * 60  # seconds
+
+# Fill routing: IB -> {option conId -> handlers of the bots trading it there}. One
+# dispatcher per IB replaces a per-bot execDetailsEvent handler that every fill would
+# fan out to. Weak, so a discarded IB drops out.
+_EXEC_ROUTER: "weakref.WeakKeyDictionary[IB, dict[int, list[Callable]]]" = weakref.WeakKeyDictionary()
+# IB -> [number of bots using its dispatcher, the dispatcher subscribed to it]
+_ROUTED_IBS: "weakref.WeakKeyDictionary[IB, list]" = weakref.WeakKeyDictionary()
+
+
+def _route_exec(routes: dict, trade, fill):
+    # Copy: a handler may remove itself while handling the fill
+    for handler in tuple(routes.get(trade.contract.conId, ())):
+        handler(trade, fill)
+
+
+def _add_route(ib: IB, con_id: int, handler: Callable):
+    handlers = _EXEC_ROUTER.setdefault(ib, {}).setdefault(con_id, [])
+    if handler not in handlers:
+        handlers.append(handler)
+
+
+def _remove_route(ib: IB, con_id: int, handler: Callable):
+    """Stop routing con_id fills to handler; other bots' routes are kept"""
+    routes = _EXEC_ROUTER.get(ib, {})
+    handlers = routes.get(con_id)
+    if handlers and handler in handlers:
+        handlers.remove(handler)
+        if not handlers:
+            del routes[con_id]
+
+
+def _attach_exec_router(ib: IB):
+    """Subscribe the shared fill dispatcher to this IB's execDetailsEvent once"""
+    entry = _ROUTED_IBS.get(ib)
+    if entry is None:
+        # Bound to the routes table, not the IB, so the IB stays collectable
+        dispatcher = partial(_route_exec, _EXEC_ROUTER.setdefault(ib, {}))
+        ib.execDetailsEvent += dispatcher
+        entry = _ROUTED_IBS[ib] = [0, dispatcher]
+    entry[0] += 1
+
+
+def _detach_exec_router(ib: IB):
+    """Release one bot's use of the dispatcher; unsubscribe it after the last"""
+    entry = _ROUTED_IBS.get(ib)
+    if entry is None:
+        return
+    entry[0] -= 1
+    if entry[0] > 0:
+        return
+    del _ROUTED_IBS[ib]
+    ib.execDetailsEvent -= entry[1]
 
 class RiskyOptionsBotStrategy(Strategy):
     """
@@ -15,6 +82,15 @@ class RiskyOptionsBotStrategy(Strategy):
     
     name = "RiskyOptionsBot"
     
+    def __init__(self):
+        super().__init__()
+        # Set by stop() to end the run early
+        self._stop_event = asyncio.Event()
+    
+    def stop(self):
+        """Ask a running strategy to stop the bot and return"""
+        self._stop_event.set()
+    
     async def run(self, ib, params, log):
         """
         Main strategy execution method called by the strategy runner
@@ -41,22 +117,30 @@ class RiskyOptionsBotStrategy(Strategy):
         
         log(f"Running strategy on {ticker} for account {account}")
         
+        bot = None
         try:
             # Create the bot instance
             bot = RiskyOptionsBot(ib, ticker, account)
+            await bot.setup()
             
-            # Run for a limited time (e.g., 1 hour) to demonstrate
+            # Run for a limited time (e.g., 1 hour) to demonstrate, or until stop()
             log(f"Bot started, running for 1 hour...")
-            await asyncio.sleep(3600)  # Run for 1 hour
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=3600)
+                log("Stop requested")
+            except asyncio.TimeoutError:
+                pass
             
-            # Stop the bot
-            bot.stop()
             log(f"{self.name} strategy completed successfully!")
             return True
             
         except Exception as e:
             log(f"Error running strategy: {e}")
             return False
+        finally:
+            # Stop the bot
+            if bot is not None:
+                bot.stop()
 
 
 class RiskyOptionsBot:
@@ -67,6 +151,9 @@ class RiskyOptionsBot:
     and exits on the next bar (simple scalp).
     """
 
+    # Completed closes kept when the close buffer wraps (the signal reads the last 3)
+    _CLOSES_KEEP = 8
+
     def __init__(self, ib: IB, ticker: str = "SPY", account: str | None = None):
         self.ib = ib
         self.ticker = ticker.upper()
@@ -75,35 +162,74 @@ class RiskyOptionsBot:
         self.entry_bars_seen = None
         self.options_contract = None
         self.last_underlying_close = None
-        self.last_chain_refresh = None
+        self._next_chain_refresh_mono = 0.0  # time.monotonic() deadline for the hourly chain refresh
         self.chains = []
+        # Picker tables for the preferred chain, rebuilt on each refresh:
+        # (chain, sorted expiry dates, matching 'YYYYMMDD' strings, sorted strikes)
+        self._chain_table = None
+        # (2 DTE expiry 'YYYYMMDD' or None, time.time() at which it goes stale): the
+        # pick only changes when the chains or the UTC date do
+        self._two_dte = None
+        # Calls qualified ahead of a signal, keyed by (expiry 'YYYYMMDD', strike)
+        self._qualified_opts: dict[tuple[str, float], Option] = {}
+        self._prequalify_task = None
+        # Completed-bar closes, oldest first, appended once per new bar
+        self._closes = np.zeros(1024, dtype=np.float64)
+        self._n = 0
+        # Total closed bars seen; entry/exit bookkeeping uses this instead of len(bars),
+        # which grows for the whole session
+        self._bars_closed = 0
+
+        self.bars = None
+        # Set while on_bar_update runs; a re-entrant call (nested IB event processing
+        # during a blocking request) is dropped instead of acting twice
+        self._busy = False
+        self._refresh_task = None
+        # Bar callback -> order worker; small, since a stale scalp signal is worth dropping
+        self._signal_q: asyncio.Queue = asyncio.Queue(maxsize=4)
+        self._order_task = None
+        # True once setup() subscribed this bot to the shared fill dispatcher
+        self._exec_routed = False
+        # orderIds this bot placed; fills routed for the same conId from another bot
+        # are ignored
+        self._own_order_ids: set[int] = set()
 
         if not self.ib.isConnected():
             print("⚠️ IB is not connected. Connect before constructing the bot.")
         # Underlying
         self.underlying = Stock(self.ticker, 'SMART', 'USD')
-        self.ib.qualifyContracts(self.underlying)
-
-        # Initial chains fetch (sync, on the ib thread)
-        self.update_options_chains()
-
-        # 5-minute historical bars with realtime updates
-        # Note: keepUpToDate=True => bars.updateEvent(bars, hasNewBar)
-        self.bars = self.ib.reqHistoricalData(
-            self.underlying,
-            endDateTime='',
-            durationStr='2 D',
-            barSizeSetting='5 mins',
-            whatToShow='TRADES',
-            useRTH=False,
-            keepUpToDate=True,
-            formatDate=1
+
+    async def setup(self):
+        """Qualify the underlying, then load chains and bars concurrently and arm the bot"""
+        await self.ib.qualifyContractsAsync(self.underlying)
+
+        # Initial chains fetch and 5-minute historical bars with realtime updates
+        # (keepUpToDate=True => bars.updateEvent(bars, hasNewBar)); neither blocks the loop
+        _, self.bars = await asyncio.gather(
+            self.update_options_chains_async(),
+            self.ib.reqHistoricalDataAsync(
+                self.underlying,
+                endDateTime='',
+                durationStr='2 D',
+                barSizeSetting='5 mins',
+                whatToShow='TRADES',
+                useRTH=False,
+                keepUpToDate=True,
+                formatDate=1
+            )
         )
         self.bars.updateEvent += self.on_bar_update
+        self._order_task = asyncio.ensure_future(self._order_worker())
+        if self.bars:
+            # The last bar is still forming; seed with the completed ones before it
+            for bar in self.bars[-self._CLOSES_KEEP - 1:-1]:
+                self._push_close(bar.close)
+            self._prequalify_candidates(self.bars[-1].close)
 
-        # Exec/fill logging (optional)
+        # Exec/fill logging (optional); fills for our option are routed to exec_status
         # (ib_async exposes execDetailsEvent just like ib_insync)
-        self.ib.execDetailsEvent += self.exec_status
+        _attach_exec_router(self.ib)
+        self._exec_routed = True
 
         # choose default account if not provided
         try:
@@ -117,130 +243,321 @@ class RiskyOptionsBot:
         print(f"✅ Bot armed on {self.ticker} using account {self.account or '(unset)'}")
 
     # -------- helpers --------
-    def update_options_chains(self):
+    async def update_options_chains_async(self):
+        if self._use_cached_chains():
+            return
         try:
-            self.chains = self.ib.reqSecDefOptParams(
+            self._apply_fetched_chains(await self.ib.reqSecDefOptParamsAsync(
                 self.underlying.symbol, '', self.underlying.secType, self.underlying.conId
-            )
-            self.last_chain_refresh = datetime.now(timezone.utc)
+            ))
         except Exception as e:
             print(f"update_options_chains error: {e}")
 
-    def pick_two_dte_call(self, underlying_last: float) -> Option | None:
-        """
-        Pick a call ~ $5 OTM with ~2 DTE from available chains.
-        """
-        if not self.chains:
-            return None
+    async def _refresh_chains_async(self):
+        """Hourly chain refresh, run as a task so on_bar_update never waits on it"""
+        await self.update_options_chains_async()
+        if self._n:
+            self._prequalify_candidates(self._closes[self._n - 1])
 
+    def _use_cached_chains(self) -> bool:
+        cached = self._load_chain_cache()
+        if cached is None:
+            return False
+        self._set_chains(cached)
+        self._next_chain_refresh_mono = time.monotonic() + 3600
+        return True
+
+    def _apply_fetched_chains(self, chains):
+        self._set_chains(chains)
+        self._next_chain_refresh_mono = time.monotonic() + 3600
+        self._store_chain_cache()
+
+    def _set_chains(self, chains):
+        """Store chains and pre-sort the preferred one for pick_two_dte_call"""
+        self.chains = chains
+        self._two_dte = None
+        if not chains:
+            self._chain_table = None
+            return
         # Prefer SMART, else first chain
-        chain = next((c for c in self.chains if getattr(c, 'exchange', '') == 'SMART'), self.chains[0])
+        chain = next((c for c in chains if getattr(c, 'exchange', '') == 'SMART'), chains[0])
+        exp_strs = sorted(str(e) for e in chain.expirations)  # 'YYYYMMDD' sorts chronologically
+        exp_dates = [datetime.strptime(e, "%Y%m%d").date() for e in exp_strs]
+        self._chain_table = (chain, exp_dates, exp_strs, sorted(chain.strikes))
+
+    def _prequalify_candidates(self, last: float):
+        """Qualify the 2 DTE calls around the likely entry strike in the background"""
+        if self._chain_table is None or (self._prequalify_task and not self._prequalify_task.done()):
+            return
+        exp_str = self._two_dte_expiry()
+        if exp_str is None:
+            return
+        chain, _, _, strikes = self._chain_table
+        # The picker wants the first strike >= last + 5; cover some drift either side
+        lo = bisect.bisect_left(strikes, last - 2)
+        hi = bisect.bisect_right(strikes, last + 10)
+        candidates = {(exp_str, float(s)): self._make_call(chain, exp_str, s) for s in strikes[lo:hi]}
+        if candidates:
+            self._prequalify_task = asyncio.ensure_future(self._qualify_candidates(candidates))
 
-        # Choose expiration nearest to 2 calendar days from now
-        now = datetime.now(timezone.utc).date()
-        def parse_exp(s):  # 'YYYYMMDD' -> date
-            return datetime.strptime(str(s), "%Y%m%d").date()
+    async def _qualify_candidates(self, candidates: dict):
+        try:
+            await self.ib.qualifyContractsAsync(*candidates.values())
+        except Exception as e:
+            print(f"⚠️ Option pre-qualify error: {e}")
+            return
+        # Swap in the new set; contracts IB could not resolve keep conId 0 and are left out
+        self._qualified_opts = {key: opt for key, opt in candidates.items() if opt.conId}
+
+    def _chain_cache_path(self) -> Path:
+        # Keyed by (symbol, conId, trading date)
+        day = datetime.now(timezone.utc).strftime("%Y%m%d")
+        return CHAIN_CACHE_DIR / self.underlying.symbol / f"{self.underlying.conId}_{day}.json"
 
-        expirations = sorted(parse_exp(e) for e in chain.expirations)
-        if not expirations:
+    def _load_chain_cache(self):
+        """Chains fetched less than CHAIN_CACHE_TTL ago (by any bot process), else None"""
+        try:
+            with open(self._chain_cache_path(), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if time.time() - float(entry["fetched_at"]) >= CHAIN_CACHE_TTL:
+                return None
+            chains = [
+                OptionChain(
+                    exchange=str(c["exchange"]),
+                    underlyingConId=str(c["underlyingConId"]),
+                    tradingClass=str(c["tradingClass"]),
+                    multiplier=str(c["multiplier"]),
+                    expirations=[str(e) for e in c["expirations"]],
+                    strikes=[float(k) for k in c["strikes"]],
+                )
+                for c in entry["chains"]
+            ]
+        except FileNotFoundError:
             return None
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable chain cache: {e}")
+            return None
+        return chains or None
 
-        target = now + timedelta(days=2)
-        # pick expiry with smallest |dte-2|
-        expiry = min(expirations, key=lambda d: abs((d - target).days))
+    def _store_chain_cache(self):
+        if not self.chains:
+            return
+        path = self._chain_cache_path()
+        try:
+            path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            chains = [
+                {
+                    "exchange": c.exchange,
+                    "underlyingConId": c.underlyingConId,
+                    "tradingClass": c.tradingClass,
+                    "multiplier": c.multiplier,
+                    "expirations": list(c.expirations),
+                    "strikes": list(c.strikes),
+                }
+                for c in self.chains
+            ]
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"chains": chains, "fetched_at": time.time()}, f)
+            # Atomic swap so concurrent readers never see a partial file
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"⚠️ Could not write chain cache: {e}")
+
+    def pick_two_dte_call(self, underlying_last: float) -> Option | None:
+        """
+        Pick a call ~ $5 OTM with ~2 DTE from available chains.
+        """
+        exp_str = self._two_dte_expiry()
+        if exp_str is None:
+            return None
+        chain, _, _, strikes = self._chain_table
 
         # choose strike >= last + 5
-        strikes = sorted(chain.strikes)
-        target_strike = next((s for s in strikes if s >= underlying_last + 5), None)
-        if target_strike is None:
+        j = bisect.bisect_left(strikes, underlying_last + 5)
+        if j == len(strikes):
+            return None
+        return self._make_call(chain, exp_str, strikes[j])
+
+    def _two_dte_expiry(self) -> str | None:
+        """'YYYYMMDD' of the preferred chain's expiration nearest to 2 calendar days from now"""
+        cached = self._two_dte
+        if cached is not None and time.time() < cached[1]:
+            return cached[0]
+        if self._chain_table is None:
             return None
+        _, exp_dates, exp_strs, _ = self._chain_table
+        today = datetime.now(timezone.utc).date()
+        stale_at = datetime.combine(today + timedelta(days=1), datetime.min.time(), timezone.utc).timestamp()
+        if not exp_dates:
+            self._two_dte = (None, stale_at)
+            return None
+        # Smallest |dte-2|, earlier one on a tie: only the neighbours around the
+        # insertion point qualify
+        target = today + timedelta(days=2)
+        i = bisect.bisect_left(exp_dates, target)
+        if i == len(exp_dates) or (i > 0 and target - exp_dates[i - 1] <= exp_dates[i] - target):
+            i -= 1
+        self._two_dte = (exp_strs[i], stale_at)
+        return exp_strs[i]
+
+    def _push_close(self, close: float):
+        n = self._n
+        if n == len(self._closes):
+            keep = self._CLOSES_KEEP
+            self._closes[:keep] = self._closes[n - keep:n]
+            n = keep
+        self._closes[n] = close
+        self._n = n + 1
+        self._bars_closed += 1
 
-        exp_str = expiry.strftime("%Y%m%d")
+    def _make_call(self, chain, exp_str: str, strike: float) -> Option:
         return Option(
             self.underlying.symbol,
             exp_str,
-            float(target_strike),
+            float(strike),
             'C',
             'SMART',
             tradingClass=getattr(chain, 'tradingClass', self.underlying.symbol)
         )
 
-    # -------- events --------
-    def on_bar_update(self, bars, has_new_bar: bool):
+    # -------- orders --------
+    def _enqueue_signal(self, signal: dict) -> bool:
         try:
-            if not has_new_bar:
+            self._signal_q.put_nowait(signal)
+            return True
+        except asyncio.QueueFull:
+            print(f"⚠️ Order queue full, dropping {signal['side']} signal")
+            return False
+
+    async def _order_worker(self):
+        """Place queued signals in order, off the bar callback"""
+        while True:
+            signal = await self._signal_q.get()
+            try:
+                if signal["side"] == "BUY":
+                    await self._place_buy(signal["opt"], signal["last"])
+                else:
+                    self._place_sell()
+            except Exception as e:
+                print(f"order worker error: {e}")
+
+    async def _place_buy(self, opt: Option, last: float):
+        # Qualify (unless the chain refresh already did) and buy 1 contract
+        qualified = self._qualified_opts.get((opt.lastTradeDateOrContractMonth, opt.strike))
+        if qualified is not None:
+            opt = qualified
+        else:
+            await self.ib.qualifyContractsAsync(opt)
+            if not opt.conId:
+                print(f"⚠️ Could not qualify {opt}, skipping entry")
                 return
+        self.options_contract = opt
+        _add_route(self.ib, opt.conId, self.exec_status)
 
-            # refresh option chains about hourly (run on ib thread via this callback)
-            if not self.last_chain_refresh or (datetime.now(timezone.utc) - self.last_chain_refresh) > timedelta(hours=1):
-                self.update_options_chains()
+        buy = MarketOrder('BUY', 1)
+        if self.account:
+            buy.account = self.account
+        trade = self.ib.placeOrder(self.options_contract, buy)
+        self._own_order_ids.add(trade.order.orderId)
+        self.last_underlying_close = last
+        print(f"▶️ BUY {self.options_contract.localSymbol if hasattr(self.options_contract, 'localSymbol') else self.options_contract} (underlying close {last})")
 
-            if len(bars) < 4:  # need at least 3 prior closes + current
+    def _place_sell(self):
+        if self.options_contract is None:
+            # The entry never went out (e.g. it failed to qualify)
+            return
+        sell = MarketOrder('SELL', 1)
+        if self.account:
+            sell.account = self.account
+        trade = self.ib.placeOrder(self.options_contract, sell)
+        self._own_order_ids.add(trade.order.orderId)
+        print("⏹️ SELL (next bar scalp)")
+        self.options_contract = None
+
+    # -------- events --------
+    def on_bar_update(self, bars, has_new_bar: bool):
+        if not has_new_bar:
+            return
+        if len(bars) >= 2:
+            # bars[-1] is the bar that just started forming; bars[-2] just closed
+            self._push_close(bars[-2].close)
+        if self._busy:
+            return
+        self._busy = True
+        try:
+            # refresh option chains about hourly in the background; this bar uses the
+            # current chains and the next one picks up the refreshed set
+            if time.monotonic() >= self._next_chain_refresh_mono:
+                if self._refresh_task is None or self._refresh_task.done():
+                    self._refresh_task = asyncio.ensure_future(self._refresh_chains_async())
+
+            n = self._n
+            if n < 3:  # need at least 3 closed bars
                 return
 
-            # Grab last three completed bars (ignore the in-progress one if any)
-            # ib_async historical-with-updates appends the forming bar at the end.
-            # Using the last 3 *closed* bars => take bars[-2], [-3], [-4] closes,
-            # then compare [-2] > [-3] > [-4], and act on the *new* forming bar.
-            c_minus1 = bars[-2].close
-            c_minus2 = bars[-3].close
-            c_minus3 = bars[-4].close
+            # Last three *closed* bars (the forming bar is never in the buffer):
+            # compare [-1] > [-2] > [-3] and act on the *new* forming bar.
+            closes = self._closes
+            c_minus1 = closes[n - 1]
+            c_minus2 = closes[n - 2]
+            c_minus3 = closes[n - 3]
 
             if not self.in_trade:
-                if c_minus1 > c_minus2 and c_minus2 > c_minus3:
-                    last = c_minus1
+                if (c_minus1 > c_minus2) & (c_minus2 > c_minus3):
+                    last = float(c_minus1)
                     opt = self.pick_two_dte_call(last)
                     if not opt:
                         return
-                    # Qualify and buy 1 contract
-                    self.ib.qualifyContracts(opt)
-                    self.options_contract = opt
-
-                    buy = MarketOrder('BUY', 1)
-                    if self.account:
-                        buy.account = self.account
-                    trade = self.ib.placeOrder(self.options_contract, buy)
-                    self.last_underlying_close = last
-                    self.in_trade = True
-                    self.entry_bars_seen = len(bars)
-                    print(f"▶️ BUY {self.options_contract.localSymbol if hasattr(self.options_contract, 'localSymbol') else self.options_contract} (underlying close {last})")
+                    # Qualifying and placing happen in _order_worker; the bar state
+                    # moves on now so the next bar sees the trade as open
+                    if self._enqueue_signal({"side": "BUY", "opt": opt, "last": last}):
+                        self.in_trade = True
+                        self.entry_bars_seen = self._bars_closed
                     return
             else:
                 # Exit on the very next completed bar after entry (simple scalp)
-                # When a new bar closes, len(bars) increases by 1
-                if self.entry_bars_seen is not None and len(bars) >= self.entry_bars_seen + 1:
-                    sell = MarketOrder('SELL', 1)
-                    if self.account:
-                        sell.account = self.account
-                    self.ib.placeOrder(self.options_contract, sell)
-                    print("⏹️ SELL (next bar scalp)")
-                    self.in_trade = False
-                    self.entry_bars_seen = None
-                    self.options_contract = None
+                if self.entry_bars_seen is not None and self._bars_closed >= self.entry_bars_seen + 1:
+                    if self._enqueue_signal({"side": "SELL"}):
+                        self.in_trade = False
+                        self.entry_bars_seen = None
 
         except Exception as e:
             print(f"on_bar_update error: {e}")
+        finally:
+            self._busy = False
 
     def exec_status(self, trade, fill):
+        if trade.order.orderId not in self._own_order_ids:
+            # Another bot's order on the same option
+            return
         # Simple fill log
         try:
             sym = getattr(trade.contract, "localSymbol", trade.contract.symbol)
             print(f"✔️ Filled {sym}: {fill.execution.shares}@{fill.execution.price}")
         except Exception:
             print("✔️ Filled")
+        # The exit fill closes the position; stop routing this contract to us
+        if getattr(fill.execution, "side", None) == "SLD":
+            _remove_route(self.ib, trade.contract.conId, self.exec_status)
+            self._own_order_ids.clear()
 
     # Optional: call this to stop cleanly
     def stop(self):
+        for task in (self._prequalify_task, self._refresh_task, self._order_task):
+            if task and not task.done():
+                task.cancel()
         try:
-            if hasattr(self, "bars"):
+            if self.bars is not None:
                 self.ib.cancelHistoricalData(self.bars)
                 self.bars.updateEvent -= self.on_bar_update
         except Exception:
             pass
-        try:
-            self.ib.execDetailsEvent -= self.exec_status
-        except Exception:
-            pass
+        for con_id in list(_EXEC_ROUTER.get(self.ib, {})):
+            _remove_route(self.ib, con_id, self.exec_status)
+        if self._exec_routed:
+            _detach_exec_router(self.ib)
+            self._exec_routed = False
         print("🛑 Bot stopped.")
 
 
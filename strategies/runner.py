@@ -7,41 +7,60 @@ This is the entrypoint that the Runner Service launches for each strategy
 import os
 import sys
 import signal
-import time
+import threading
 import json
+import logging
 import argparse
 import psycopg2
 from datetime import datetime
 from pathlib import Path
 
-# Global flag for graceful shutdown
-stopping = False
+logger = logging.getLogger("runner")
+
+# Set on SIGTERM/SIGINT; the main loop sleeps on it between heartbeats
+stop_event = threading.Event()
 
 def signal_handler(signum, frame):
     """Handle termination signals gracefully"""
-    global stopping
     print(f"🛑 Received signal {signum}, initiating graceful shutdown...")
-    stopping = True
+    stop_event.set()
+
+# Heartbeat connection, opened on first use and kept for the life of the process
+_hb_conn = None
+
+def _get_hb_conn(db_url: str):
+    """Return the heartbeat connection, (re)connecting and PREPAREing the UPDATE if needed"""
+    global _hb_conn
+    if _hb_conn is None or _hb_conn.closed:
+        conn = psycopg2.connect(db_url)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("PREPARE hb AS UPDATE runs SET last_heartbeat = $1 WHERE id = $2")
+        _hb_conn = conn
+    return _hb_conn
 
 def update_heartbeat(run_id: int, db_url: str):
     """Update heartbeat in database"""
+    global _hb_conn
     try:
-        conn = psycopg2.connect(db_url)
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE runs SET last_heartbeat = %s WHERE id = %s",
-            (datetime.now(), run_id)
-        )
-        conn.commit()
-        conn.close()
+        with _get_hb_conn(db_url).cursor() as cursor:
+            cursor.execute("EXECUTE hb (%s, %s)", (datetime.now(), run_id))
     except Exception as e:
         print(f"⚠️ Failed to update heartbeat: {e}")
+        # Drop the connection so the next heartbeat reconnects
+        if _hb_conn is not None:
+            try:
+                _hb_conn.close()
+            except Exception:
+                pass
+            _hb_conn = None
 
 def main():
     parser = argparse.ArgumentParser(description="Strategy Runner Shim")
     parser.add_argument("--run-id", required=True, type=int, help="Run ID from database")
     parser.add_argument("--db-url", help="Database connection URL")
     args = parser.parse_args()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
     
     # Get database URL from environment or argument
     db_url = args.db_url or os.getenv('DATABASE_URL', 'postgresql://localhost/options_trading')
@@ -52,30 +71,23 @@ def main():
         signal.signal(signal.SIGINT, signal_handler)
     
     print(f"🚀 Starting strategy for run {args.run_id}")
-    print(f"📊 Environment: {dict(os.environ)}")
+    # The full environment is large; only format it when debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("📊 Environment: %s", dict(os.environ))
     
     # Get strategy configuration from environment
     strategy_id = os.getenv('STRATEGY_ID')
     strategy_name = os.getenv('STRATEGY_NAME', 'Unknown')
     
     # Start heartbeat loop
-    last_heartbeat = time.time()
     heartbeat_interval = 10  # seconds
     
     try:
-        # Main strategy loop
-        while not stopping:
-            current_time = time.time()
-            
-            # Send heartbeat
-            if current_time - last_heartbeat >= heartbeat_interval:
-                update_heartbeat(args.run_id, db_url)
-                last_heartbeat = current_time
-                print(f"💓 Heartbeat sent at {datetime.now()}")
-            
-            # Here you would normally run your strategy logic
-            # For now, just simulate work
-            time.sleep(1)
+        # Main strategy loop: one wakeup per heartbeat, or immediately on a stop signal.
+        # Here you would normally run your strategy logic; for now we only heartbeat.
+        while not stop_event.wait(timeout=heartbeat_interval):
+            update_heartbeat(args.run_id, db_url)
+            print(f"💓 Heartbeat sent at {datetime.now()}")
             
         print("✅ Strategy completed gracefully")
         return 0
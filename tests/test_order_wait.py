@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("ib_async")
+pytest.importorskip("numpy")
+
+from cursorstrategies.momentum import Momentum
+
+_DONE = {"Filled", "Cancelled", "ApiCancelled"}
+
+
+class _StatusEvent:
+    """Awaitable like an eventkit Event: resolves on the next emit()"""
+
+    def __init__(self):
+        self._waiters = []
+
+    def emit(self, trade):
+        waiters, self._waiters = self._waiters, []
+        for fut in waiters:
+            if not fut.done():
+                fut.set_result(trade)
+
+    def __await__(self):
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        return fut.__await__()
+
+
+class _FakeTrade:
+    """Trade without doneEvent, as in ib_async; only the parts strategies read"""
+
+    def __init__(self):
+        self.orderStatus = type("OrderStatus", (), {"status": "PendingSubmit", "avgFillPrice": 0.0})()
+        self.statusEvent = _StatusEvent()
+
+    def isDone(self):
+        return self.orderStatus.status in _DONE
+
+    def set_status(self, status, avg_fill_price=0.0):
+        self.orderStatus.status = status
+        self.orderStatus.avgFillPrice = avg_fill_price
+        self.statusEvent.emit(self)
+
+
+class _FakeIB:
+    """placeOrder() returns a trade that walks through `statuses` on later loop turns"""
+
+    def __init__(self, *statuses):
+        self._statuses = statuses
+        self.trades = []
+
+    def isConnected(self):
+        return True
+
+    def placeOrder(self, contract, order):
+        trade = _FakeTrade()
+        loop = asyncio.get_running_loop()
+        for i, status in enumerate(self._statuses, 1):
+            loop.call_later(0.01 * i, trade.set_status, *status)
+        self.trades.append(trade)
+        return trade
+
+
+def test_buy_records_the_fill():
+    ib = _FakeIB(("Submitted",), ("Filled", 101.5))
+    strategy = Momentum(ib)
+
+    asyncio.run(asyncio.wait_for(strategy.buy(), timeout=2))
+
+    assert strategy.in_trade
+    assert strategy.position == 100
+    assert strategy.entry_price == 101.5
+
+
+def test_buy_returns_promptly_on_rejection():
+    ib = _FakeIB(("Submitted",), ("Cancelled",))
+    strategy = Momentum(ib)
+
+    # Well under the 5s _wait_filled timeout: the terminal status ends the wait
+    asyncio.run(asyncio.wait_for(strategy.buy(), timeout=1))
+
+    assert not strategy.in_trade
+    assert strategy.position == 0
+    assert ib.trades[0].orderStatus.status == "Cancelled"
@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("ib_async")
+
+from app import strategy_base
+from app.connection_manager import ConnectionManager
+
+
+class _Idle(strategy_base.Strategy):
+    name = "idle"
+
+    async def run(self, ib, params, log):
+        pass
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    cm = ConnectionManager()
+    monkeypatch.setattr(strategy_base, "connection_manager", cm)
+    return cm
+
+
+def test_get_connection_info_reports_summary(manager):
+    info = _Idle().get_connection_info()
+
+    assert info["strategy_name"] == "idle"
+    assert info["required_type"] == "paper"
+    assert info["last_check"] is None
+    summary = info["connection_manager_status"]
+    assert summary["connected"] is False
+    assert summary["connections"] == {"paper": "disconnected", "real": "disconnected"}
+
+
+def test_get_connection_info_refreshes_after_state_change(manager):
+    strategy = _Idle()
+    before = strategy.get_connection_info()["connection_manager_status"]
+    assert strategy.get_connection_info()["connection_manager_status"] is before
+
+    manager._set_state("paper", True)
+    after = strategy.get_connection_info()["connection_manager_status"]
+
+    assert after is not before
+    assert after["active_mode"] == "paper"
+    assert after["connections"] == {"paper": "connected", "real": "disconnected"}
+
+
+def test_connection_callback_sets_connected(manager):
+    strategy = _Idle()
+    strategy.register_connection_callback()
+
+    manager._set_state("paper", True)
+    assert strategy.connection_status == "connected"
+    assert strategy.is_connection_healthy()
+
+    manager._set_state("real", True)
+    assert strategy.connection_status == "disconnected"
+    assert not strategy.is_connection_healthy()